@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Benchmark the pim commands against a local stand-in for the PIM API.
+
+The stand-in serves the aadGroups roleAssignments and roleAssignmentRequests endpoints
+with pagination, injected latency and optional 429 throttling. Token acquisition and
+the Graph user lookup are stubbed, so no Azure login is needed. Results are appended to
+.bench/results.jsonl with the current git commit, and compared with the last run from a
+different commit.
+
+The scan scenario iterates over every active assignment without building command output,
+so its peak memory shows what decoding the API responses costs. It should stay flat as
+the size grows, as only part of one page is held in memory at a time.
+
+The pooled and unpooled scenarios make the same small calls one after another, through
+the shared session or with a new connection for each call as requests.get would. Each
+new connection to the stand-in waits --connect-latency, standing in for the TCP and TLS
+handshakes, so the difference per call shows what connection reuse saves. They do not
+depend on the size, so only run for the first.
+
+Usage: python scripts/benchmark.py [--sizes 10 100 1000 10000] [--latency 0.02]
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "pim"))
+
+RESULTS_FILE = os.path.join(ROOT_DIR, ".bench", "results.jsonl")
+USER_ID = "00000000-0000-0000-0000-000000000001"
+TENANT_ID = "00000000-0000-0000-0000-00000000000a"
+DEFAULT_PAGE_SIZE = 100
+
+COMMANDS = ["list", "active", "status", "request", "scan", "pooled", "unpooled"]
+
+# Calls made one after another by the pooled and unpooled scenarios
+POOLING_CALLS = 10
+
+
+class StubPimApi(ThreadingHTTPServer):
+    """Local HTTP server mimicking the PIM aadGroups API."""
+
+    daemon_threads = True
+
+    def __init__(self, size, latency=0.0, throttle_every=0, connect_latency=0.0):
+        super().__init__(("127.0.0.1", 0), StubPimHandler)
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.throttle_every = throttle_every
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.assignments = {
+            "Eligible": [_assignment(i, "Eligible") for i in range(size)],
+            "Active": [_assignment(i, "Active") for i in range(size // 2)],
+        }
+        self.requests = [_request(i) for i in range(size // 4)]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}/api/v2/privilegedAccess"
+
+
+class StubPimHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Once per connection, as the handshakes of a real one would be
+        time.sleep(self.server.connect_latency)
+        super().setup()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if not self._start_request():
+            return
+
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        query_filter = query.get("$filter", [""])[0]
+        if url.path.endswith("/roleAssignments"):
+            state = "Active" if "'Active'" in query_filter else "Eligible"
+            items = self.server.assignments[state]
+        elif url.path.endswith("/roleAssignmentRequests"):
+            items = self.server.requests
+        else:
+            self._send(404, {"error": {"message": "Not found"}})
+            return
+
+        group_filter = re.search(
+            r"resource/displayName eq '((?:[^']|'')*)'", query_filter
+        )
+        if group_filter:
+            group_name = group_filter.group(1).replace("''", "'")
+            items = [i for i in items if i["resource"]["displayName"] == group_name]
+
+        # Server driven paging, honouring Prefer: odata.maxpagesize
+        page_size = DEFAULT_PAGE_SIZE
+        prefer = self.headers.get("Prefer", "")
+        if prefer.startswith("odata.maxpagesize="):
+            page_size = int(prefer.split("=")[1])
+        skip = int(query.get("$skiptoken", ["0"])[0])
+        body = {"value": items[skip : skip + page_size]}
+        if skip + page_size < len(items):
+            query["$skiptoken"] = [str(skip + page_size)]
+            next_query = urllib.parse.urlencode(query, doseq=True)
+            body["@odata.nextLink"] = (
+                f"http://{self.headers['Host']}{url.path}?{next_query}"
+            )
+        self._send(200, body)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        if not self._start_request():
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        self._send(
+            201,
+            {
+                "id": f"request-{time.monotonic_ns()}",
+                "resourceId": request["resourceId"],
+                "status": {"status": "Closed", "subStatus": "Provisioned"},
+            },
+        )
+
+    def _start_request(self):
+        with self.server.lock:
+            self.server.request_count += 1
+            count = self.server.request_count
+        time.sleep(self.server.latency)
+
+        if self.server.throttle_every and count % self.server.throttle_every == 0:
+            # Read any body first, or it is taken as the next request on the connection
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+        return True
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StubConfig:
+    """Stand-in for the CLI config, returning fallbacks apart from the given overrides."""
+
+    def __init__(self, config_dir, **overrides):
+        self.config_dir = config_dir
+        self.overrides = overrides
+
+    def get(self, section, option, fallback=None):
+        return self.overrides.get(f"{section}.{option}", fallback)
+
+    getint = getfloat = getboolean = get
+
+
+def _assignment(i, state):
+    return {
+        "id": f"{state.lower()}-{i}",
+        "resourceId": f"resource-{i}",
+        "memberType": "Direct",
+        "assignmentState": state,
+        "endDateTime": "2030-01-01T12:00:00Z" if state == "Active" else None,
+        "status": "Accepted",
+        "resource": {"displayName": f"Group-{i}"},
+        "roleDefinition": {"id": f"role-{i % 2}", "displayName": "Member"},
+    }
+
+
+def _request(i):
+    return {
+        "id": f"request-{i}",
+        "requestedDateTime": "2026-01-01T12:00:00Z",
+        "status": {"status": "Pending", "subStatus": "PendingApproval"},
+        "resource": {"displayName": f"Group-{i}"},
+        "roleDefinition": {"id": "role-0", "displayName": "Member"},
+    }
+
+
+def _fake_token():
+    """An unsigned JWT carrying the oid claim, enough for get_user_id."""
+    claims = json.dumps({"oid": USER_ID, "tid": TENANT_ID}).encode()
+    payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+    return f"e30.{payload}.sig"
+
+
+def _install_stubs(base_url):
+    """Stub out token acquisition and the Graph user lookup, and point at the stand-in."""
+    from azure.cli.core._profile import Profile
+    from azext_pim import _client_factory, _token_cache, pim
+
+    def get_raw_token(self, resource=None, **_):  # pylint: disable=unused-argument
+        entry = {"expires_on": int(time.time()) + 3600}
+        return ("Bearer", _fake_token(), entry), None, TENANT_ID
+
+    class StubGraphClient:  # pylint: disable=too-few-public-methods
+        def signed_in_user_get(self):
+            return {"id": USER_ID}
+
+    Profile.__init__ = lambda self, cli_ctx=None, **_: None
+    Profile.get_raw_token = get_raw_token
+    _client_factory._graph_client_factory = lambda cli_ctx, **_: StubGraphClient()
+    _token_cache.account_key = (
+        lambda cli_ctx, tenant=None: f"{tenant or TENANT_ID}/bench@example.com"
+    )
+    pim.PIM_API_BASE_URL = base_url
+
+
+def _run_command(name, cmd):
+    from azext_pim import custom
+    from azext_pim._client_factory import cf_pim
+
+    if name == "list":
+        return custom.list_pim(cmd)
+    if name == "active":
+        return custom.active_pim(cmd)
+    if name == "status":
+        return custom.status_pim(cmd)
+    if name == "request":
+        return custom.request_pim(cmd, ["Group-0"], "Benchmark")
+    if name == "scan":
+        return sum(1 for _ in cf_pim(cmd.cli_ctx).iter_active())
+    if name in ("pooled", "unpooled"):
+        return _run_calls(cmd, pooled=name == "pooled")
+    raise ValueError(name)
+
+
+def _run_calls(cmd, pooled):
+    """Make small PIM API calls one after another, reusing connections or not."""
+    from azext_pim import _session, pim
+
+    url = pim.build_query_url(
+        "roleAssignments", ["resource/displayName eq 'Group-0'"], ["id"]
+    )
+    get_session = _session.get_session
+    if not pooled:
+        _session.get_session = _unpooled_session
+    try:
+        for _ in range(POOLING_CALLS):
+            pim.pim_api_request(cmd.cli_ctx, "GET", url)
+    finally:
+        _session.get_session = get_session
+
+
+def _unpooled_session():
+    """A session which closes its connection after one call, as requests.get does."""
+    import requests
+
+    session = requests.Session()
+    request = session.request
+
+    def request_once(*args, **kwargs):
+        try:
+            return request(*args, **kwargs)
+        finally:
+            session.close()
+
+    session.request = request_once
+    return session
+
+
+def _measure(name, cmd, repeat):
+    """Run a command repeatedly, returning the latencies and peak traced memory."""
+    from azext_pim import _session
+
+    latencies = []
+    peak = 0
+    for _ in range(repeat):
+        # Each run is a separate command, so gets its own API deadline
+        _session._deadline = None  # pylint: disable=protected-access
+        tracemalloc.start()
+        start = time.perf_counter()
+        _run_command(name, cmd)
+        latencies.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return latencies, peak
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _load_baseline(commit):
+    """Get the results of the most recent run from a different commit, keyed by scenario."""
+    try:
+        with open(RESULTS_FILE, "r", encoding="utf-8") as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return None, {}
+
+    for run in reversed(runs):
+        if run["commit"] != commit:
+            return run["commit"], {(r["command"], r["size"]): r for r in run["results"]}
+    return None, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--commands", nargs="+", default=COMMANDS, choices=COMMANDS)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds per API call"
+    )
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.02,
+        help="Seconds per new connection, for the handshakes",
+    )
+    parser.add_argument(
+        "--throttle-every",
+        type=int,
+        default=0,
+        help="Return a 429 for every Nth API call",
+    )
+    parser.add_argument("--page-size", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--eligibility-cache",
+        action="store_true",
+        help="Leave the eligibility cache on",
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Do not store the results"
+    )
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    baseline_commit, baseline = _load_baseline(commit)
+    results = []
+
+    print(
+        f"{'Command':<10} {'Size':>6} {'Median ms':>10} {'Min ms':>10} {'Peak KiB':>10} {'Calls':>6}  Change"
+    )
+    for size in args.sizes:
+        server = StubPimApi(
+            size, args.latency, args.throttle_every, args.connect_latency
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _install_stubs(server.base_url)
+
+        with tempfile.TemporaryDirectory() as config_dir:
+            config = StubConfig(
+                config_dir,
+                **{
+                    "pim.page_size": args.page_size,
+                    "pim.retry_backoff_base": 0.05,
+                    "pim.eligibility_cache_ttl": 86400 if args.eligibility_cache else 0,
+                },
+            )
+            cmd = types.SimpleNamespace(cli_ctx=types.SimpleNamespace(config=config))
+
+            for name in args.commands:
+                if name in ("pooled", "unpooled") and size != args.sizes[0]:
+                    continue
+                # Warm up the session and caches, as a run after the first would be
+                _run_command(name, cmd)
+                calls_before = server.request_count
+                latencies, peak = _measure(name, cmd, args.repeat)
+                calls = (server.request_count - calls_before) // args.repeat
+
+                result = {
+                    "command": name,
+                    "size": size,
+                    "median": statistics.median(latencies),
+                    "min": min(latencies),
+                    "peak_bytes": peak,
+                    "calls": calls,
+                }
+                results.append(result)
+
+                change = ""
+                previous = baseline.get((name, size))
+                if previous:
+                    change = f"{(result['median'] / previous['median'] - 1) * 100:+.1f}% vs {baseline_commit}"
+                print(
+                    f"{name:<10} {size:>6} {result['median'] * 1000:>10.1f} {result['min'] * 1000:>10.1f} "
+                    f"{peak / 1024:>10.1f} {calls:>6}  {change}"
+                )
+
+        server.shutdown()
+        server.server_close()
+
+    medians = {r["command"]: r["median"] for r in results if r["size"] == args.sizes[0]}
+    if "pooled" in medians and "unpooled" in medians:
+        pooled, unpooled = (
+            medians[name] / POOLING_CALLS * 1000 for name in ("pooled", "unpooled")
+        )
+        print(
+            f"\nConnection reuse: {pooled:.1f} ms per call pooled, {unpooled:.1f} ms unpooled, "
+            f"{unpooled - pooled:.1f} ms saved per extra call"
+        )
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            run = {
+                "commit": commit,
+                "timestamp": time.time(),
+                "python": sys.version.split()[0],
+                "args": vars(args),
+                "results": results,
+            }
+            f.write(json.dumps(run) + "\n")
+
+
+if __name__ == "__main__":
+    main()
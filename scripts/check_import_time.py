@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Check the import cost of the modules Azure CLI loads for help, completion and argument parsing.
+
+Runs a fresh interpreter with -X importtime, with knack and azure.cli.core already imported
+as they are inside the CLI. Fails if any of the HTTP or auth stack is imported, or if the
+extension modules together take longer than the budget. Also checks that the prompt script,
+which is run for every shell prompt, imports nothing outside the standard library.
+
+Usage: python scripts/check_import_time.py [--budget-ms 30]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Already loaded by the CLI before the extension
+PRELOADED_MODULES = ["knack.util", "knack.log", "azure.cli.core"]
+
+# Loaded when the command table and arguments are built, e.g. for `az pim --help`
+EXTENSION_MODULES = [
+    "azext_pim",
+    "azext_pim.commands",
+    "azext_pim._params",
+    "azext_pim._help",
+    "azext_pim.custom",
+]
+
+# Should only be imported once a command actually runs
+FORBIDDEN_MODULES = [
+    "requests",
+    "urllib3",
+    "msal",
+    "azure.cli.core._profile",
+    "azure.cli.command_modules.role",
+]
+
+# Run directly by shell prompts, so should not import the Azure CLI or any dependencies
+PROMPT_SCRIPT = os.path.join(ROOT_DIR, "src", "pim", "azext_pim", "prompt.py")
+PROMPT_FORBIDDEN_MODULES = ["azure", "knack", "azext_pim", "requests", "msal"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure():
+    """Get the cumulative import time in microseconds of each top level module imported."""
+    code = (
+        f"import {', '.join(PRELOADED_MODULES)}; import {', '.join(EXTENSION_MODULES)}"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT_DIR, "src", "pim"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    matches = [IMPORTTIME_LINE.match(line) for line in result.stderr.splitlines()]
+    matches = [match for match in matches if match]
+
+    # Only count what is imported after the last preloaded module, a single space
+    # of indent marks a module imported directly rather than by another module
+    start = max(
+        index
+        for index, match in enumerate(matches)
+        if match.group(4) == PRELOADED_MODULES[-1] and len(match.group(3)) == 1
+    )
+    imported = {}
+    total = 0
+    for match in matches[start + 1 :]:
+        imported[match.group(4)] = int(match.group(2))
+        if len(match.group(3)) == 1:
+            total += int(match.group(2))
+    return imported, total
+
+
+def measure_prompt():
+    """Get the top level packages imported when running the prompt script."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        env = dict(
+            os.environ,
+            AZURE_CONFIG_DIR=config_dir,
+            AZURE_PIM_PROMPT_REFRESH_INTERVAL="inf",
+        )
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", PROMPT_SCRIPT],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    matches = [IMPORTTIME_LINE.match(line) for line in result.stderr.splitlines()]
+    return {match.group(4).split(".")[0] for match in matches if match}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    # Warm up so bytecode compilation is not counted
+    measure()
+    imported, total = measure()
+
+    failed = False
+    forbidden = sorted(
+        name
+        for name in imported
+        for prefix in FORBIDDEN_MODULES
+        if name == prefix or name.startswith(prefix + ".")
+    )
+    if forbidden:
+        print(f"FAIL: modules imported before a command runs: {', '.join(forbidden)}")
+        failed = True
+
+    prompt_forbidden = sorted(set(PROMPT_FORBIDDEN_MODULES) & measure_prompt())
+    if prompt_forbidden:
+        print(f"FAIL: modules imported by prompt.py: {', '.join(prompt_forbidden)}")
+        failed = True
+
+    print(f"Extension import time: {total / 1000:.1f}ms (budget {args.budget_ms}ms)")
+    if total / 1000 > args.budget_ms:
+        slowest = sorted(imported.items(), key=lambda item: item[1], reverse=True)[:10]
+        for name, micros in slowest:
+            print(f"  {micros / 1000:8.1f}ms  {name}")
+        print("FAIL: import time budget exceeded")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import socket
+import threading
+import time
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+SOCKET_FILE = "broker.sock"
+
+# Response headers which describe the body as sent by the PIM API, not as relayed
+HOP_HEADERS = ("connection", "content-encoding", "content-length", "transfer-encoding")
+
+BROKER_CHUNK_SIZE = 64 * 1024
+
+# Connections waiting to be accepted, enough for a burst of commands starting at once
+BROKER_BACKLOG = 128
+
+# Set when the broker is not reachable, or in the broker itself, so calls go direct
+_unavailable = False
+
+
+def get_broker(cli_ctx):
+    """Get a client for the local broker if one is listening, or None to call the API directly.
+
+    Disabled with the `pim.use_broker` setting.
+    """
+    if _unavailable or not hasattr(socket, "AF_UNIX"):
+        return None
+    path = os.path.join(cli_ctx.config.config_dir, "pim", SOCKET_FILE)
+    if not os.path.exists(path):
+        return None
+    if not cli_ctx.config.getboolean("pim", "use_broker", fallback=True):
+        return None
+    return BrokerClient(cli_ctx, path)
+
+
+class BrokerClient:
+    """Sends PIM API calls through the broker, which owns the token and connection pool."""
+
+    def __init__(self, cli_ctx, path):
+        self.cli_ctx = cli_ctx
+        self.path = path
+
+    def request(self, method, url, body=None, headers=None, tenant=None):
+        """Send a PIM API call, returning the response or None if the broker is unreachable."""
+        from azext_pim._trace import span
+
+        with span(
+            self.cli_ctx, f"broker {method}", method=method, url=url.split("?")[0]
+        ) as attributes:
+            response = self._send(
+                {
+                    "op": "request",
+                    "method": method,
+                    "url": url,
+                    "body": body,
+                    "headers": headers or {},
+                    "tenant": tenant,
+                }
+            )
+            if response is not None:
+                attributes["status_code"] = response.status_code
+            return response
+
+    def get_user_id(self, tenant=None):
+        """Get the signed in user's object ID from the broker, or None if it is unreachable."""
+        response = self._send({"op": "user_id", "tenant": tenant})
+        if response is None:
+            return None
+        with response:
+            return response.json()
+
+    def _send(self, message):
+        global _unavailable  # pylint: disable=global-statement
+        from azext_pim._session import _get_deadline
+        from azext_pim._token_cache import account_key
+
+        # The broker only answers for the account this command is signed in as
+        message["account"] = account_key(self.cli_ctx)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(max(_get_deadline(self.cli_ctx) - time.monotonic(), 0.1))
+            sock.connect(self.path)
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            reader = sock.makefile("rb")
+            header = json.loads(reader.readline() or b"null")
+        except socket.timeout as e:
+            sock.close()
+            raise CLIError("Timed out waiting for the PIM broker") from e
+        except BlockingIOError as e:
+            # The broker's connection backlog is full, so call directly this time only
+            sock.close()
+            logger.debug("PIM broker busy, calling the API directly: %s", e)
+            return None
+        except (OSError, ValueError) as e:
+            # A stale socket or a broker which has gone away, so stop trying it
+            sock.close()
+            logger.debug("PIM broker unavailable, calling the API directly: %s", e)
+            _unavailable = True
+            return None
+
+        if header is None:
+            sock.close()
+            _unavailable = True
+            return None
+        if header.get("refused"):
+            # Signed in as another account than the broker, so call directly this time only
+            sock.close()
+            logger.debug("PIM broker refused the call: %s", header["refused"])
+            return None
+        if header.get("error"):
+            sock.close()
+            raise CLIError(header["error"])
+        return BrokerResponse(sock, reader, header["status"], header.get("headers"))
+
+
+class BrokerResponse:
+    """A PIM API response relayed by the broker, read from the socket as it arrives.
+
+    Has the parts of a requests response which pim_api_request and iter_pages use.
+    """
+
+    def __init__(self, sock, reader, status_code, headers=None):
+        from requests.structures import CaseInsensitiveDict
+
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self._sock = sock
+        self._reader = reader
+        self._content = None
+
+    def iter_content(self, chunk_size=BROKER_CHUNK_SIZE):
+        import requests
+
+        if self._content is not None:
+            yield self._content
+            return
+        try:
+            while True:
+                chunk = self._reader.read1(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        except OSError as e:
+            raise requests.exceptions.ConnectionError(e) from e
+        finally:
+            self.close()
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_content())
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def serve(cli_ctx, idle_timeout=0):
+    """Run the broker on the socket in the CLI config directory until interrupted or idle.
+
+    Returns counts of the calls it received, and of those answered by joining an
+    identical call already in flight rather than calling the PIM API again.
+    """
+    global _unavailable  # pylint: disable=global-statement
+    import socketserver
+    from azext_pim._cache import cache_path
+
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise CLIError(
+            "The PIM broker needs Unix domain sockets, which are not available"
+        )
+
+    # The broker makes its own calls directly
+    _unavailable = True
+    path = cache_path(cli_ctx, SOCKET_FILE)
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            raise CLIError(f"A PIM broker is already listening on {path}")
+        except OSError:
+            os.unlink(path)
+        finally:
+            probe.close()
+
+    broker = _Broker(cli_ctx)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            broker.handle(self.rfile, self.wfile)
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = BROKER_BACKLOG
+
+    # Only the current user can connect, as the broker calls the API as them
+    old_umask = os.umask(0o177)
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(old_umask)
+
+    if idle_timeout:
+        threading.Thread(
+            target=_shutdown_when_idle,
+            args=(server, broker, idle_timeout),
+            name="pim-broker-idle",
+            daemon=True,
+        ).start()
+
+    logger.warning("PIM broker listening on %s, press Ctrl+C to stop", path)
+    try:
+        server.serve_forever(poll_interval=1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return broker.stats
+
+
+def _shutdown_when_idle(server, broker, idle_timeout):
+    while time.monotonic() - broker.last_active < idle_timeout:
+        time.sleep(1)
+    logger.warning("PIM broker idle for %ds, stopping", idle_timeout)
+    server.shutdown()
+
+
+class _Broker:
+    """Answers calls from CLI processes, sharing one call to the PIM API between identical GETs."""
+
+    def __init__(self, cli_ctx):
+        self.cli_ctx = cli_ctx
+        self.stats = {"requests": 0, "coalesced": 0, "apiCalls": 0}
+        self.last_active = time.monotonic()
+        self._account = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def handle(self, rfile, wfile):
+        try:
+            message = json.loads(rfile.readline())
+        except ValueError:
+            return
+        with self._lock:
+            self.stats["requests"] += 1
+            self.last_active = time.monotonic()
+
+        try:
+            refused = self._check_account(message.get("account"))
+            if refused:
+                result = ({"refused": refused}, b"")
+            elif message.get("op") == "user_id":
+                result = self._single_flight(
+                    ("user_id", message.get("tenant")), lambda: self._user_id(message)
+                )
+            elif message.get("method") == "GET":
+                key = (
+                    message["url"],
+                    message.get("tenant"),
+                    tuple(sorted(message.get("headers", {}).items())),
+                )
+                result = self._single_flight(key, lambda: self._call(message))
+            else:
+                # Only GETs are shared, as every other call changes something
+                result = self._call(message)
+        except CLIError as e:
+            result = ({"error": str(e)}, b"")
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("PIM broker call failed: %s", e)
+            result = ({"error": f"PIM broker call failed: {e}"}, b"")
+
+        header, body = result
+        try:
+            wfile.write(json.dumps(header).encode() + b"\n")
+            wfile.write(body)
+        except OSError as e:
+            logger.debug("PIM broker client went away: %s", e)
+
+    def _single_flight(self, key, call):
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = {"done": threading.Event()}
+            else:
+                self.stats["coalesced"] += 1
+
+        if leader:
+            try:
+                flight["result"] = call()
+            except Exception as e:  # pylint: disable=broad-except
+                flight["error"] = e
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+                flight["done"].set()
+        else:
+            flight["done"].wait()
+
+        if "error" in flight:
+            raise flight["error"]
+        return flight["result"]
+
+    def _call(self, message):
+        """Call the PIM API for a client, returning the response header and its whole body.
+
+        The body is read in full before it is relayed, rather than streamed through, so
+        the response to a GET can be shared with every client waiting on the same call.
+        """
+        import requests
+        from azext_pim._session import DEFAULT_DEADLINE, extend_deadline, send_request
+        from azext_pim.pim import PIM_API_BASE_URL, get_pim_token
+
+        # Checked before getting a token, so the token is only ever sent to the PIM API
+        if not message["url"].startswith(PIM_API_BASE_URL + "/"):
+            raise CLIError(
+                f"The PIM broker only calls the PIM API, not {message['url']}"
+            )
+        # Each call gets the full deadline, as the broker outlives any one command
+        extend_deadline(
+            self.cli_ctx.config.getfloat("pim", "deadline", fallback=DEFAULT_DEADLINE)
+        )
+        token = get_pim_token(self.cli_ctx, message.get("tenant"))
+        with self._lock:
+            self.stats["apiCalls"] += 1
+        try:
+            response = send_request(
+                self.cli_ctx,
+                message["method"],
+                message["url"],
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json",
+                    **message.get("headers", {}),
+                },
+                json=message.get("body"),
+            )
+        except requests.exceptions.Timeout as e:
+            raise CLIError(f"PIM API request timed out: {e}") from e
+        except requests.exceptions.ConnectionError as e:
+            raise CLIError(f"Unable to connect to the PIM API: {e}") from e
+
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in HOP_HEADERS
+        }
+        return {"status": response.status_code, "headers": headers}, response.content
+
+    def _user_id(self, message):
+        from azext_pim.pim import get_user_id
+
+        user_id = get_user_id(self.cli_ctx, message.get("tenant"))
+        return {"status": 200}, json.dumps(user_id).encode()
+
+    def _check_account(self, account):
+        """Check a client is signed in as the broker's account, or why the call is refused.
+
+        The profile is loaded again when they differ, as `az login` or `az account set` in
+        another shell only changes it on disk, and the tokens held for the account the
+        broker was signed in as are dropped.
+        """
+        from azure.cli.core._profile import ACCOUNT
+        from azext_pim._token_cache import account_key, clear_tokens
+
+        with self._lock:
+            if self._account is None:
+                self._account = account_key(self.cli_ctx)
+            if account == self._account:
+                return None
+            ACCOUNT.load(
+                os.path.join(self.cli_ctx.config.config_dir, "azureProfile.json")
+            )
+            current = account_key(self.cli_ctx)
+            if current != self._account:
+                logger.warning("Account changed to %s, dropping tokens", current)
+                clear_tokens()
+                self._account = current
+        if account != current:
+            return f"The PIM broker is signed in as {current}, not {account}"
+        return None
@@ -0,0 +1,48 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+
+
+def cache_path(cli_ctx, name):
+    """Get the path of a cache file in the extension's cache directory."""
+    cache_dir = os.path.join(cli_ctx.config.config_dir, "pim")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, name)
+
+
+def load_json(path, default=None):
+    """Load a JSON cache file, returning the default if missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """Atomically write a JSON cache file, readable only by the current user.
+
+    The temporary file is unique to each call, so threads and processes writing the same
+    file at once each replace it whole. Callers which read, change and write back a file
+    must still hold a lock, or one writer's changes are lost.
+    """
+    import tempfile
+
+    # mkstemp creates the file readable only by the current user
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -9,3 +9,11 @@ def _graph_client_factory(cli_ctx, **_):
     from azure.cli.command_modules.role._msgrpah import GraphClient
 
     return GraphClient(cli_ctx)
+
+
+def cf_pim(cli_ctx, *_, tenant=None, provider=None):
+    """Create a PIM client for the current user, in the current or another tenant."""
+    from azext_pim.client import PimClient
+    from azext_pim.pim import DEFAULT_PROVIDER
+
+    return PimClient(cli_ctx, tenant, provider or DEFAULT_PROVIDER)
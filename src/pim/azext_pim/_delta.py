@@ -0,0 +1,132 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+from knack.log import get_logger
+from azext_pim._records import RoleAssignment, RoleAssignmentRequest, parse_datetime
+
+logger = get_logger(__name__)
+
+DELTA_STATE_FILE = "delta.json"
+
+# Bumped when the rows kept change, state from another version is treated as a first run
+DELTA_STATE_VERSION = 2
+
+ADDED = "Added"
+CHANGED = "Changed"
+REMOVED = "Removed"
+
+# Held while reading and writing the state, as tenants and providers are queried concurrently
+_lock = threading.Lock()
+
+
+def get_changes(cli_ctx, client, view):
+    """Get the active assignments, or pending requests, which changed since the last run.
+
+    Each row is kept from run to run as a fingerprint of its ID with its status and end
+    time, or status and sub status for requests. Returns (change, record) pairs for the
+    rows added or changed, in the API's order, then those removed. On the first run every
+    row is added. When the last result had an ETag the query is conditional on it, and if
+    the service answers 304 Not Modified nothing is downloaded or compared.
+    """
+    from azext_pim._cache import cache_path, load_json, save_json
+    from azext_pim._token_cache import account_key
+
+    path = cache_path(cli_ctx, DELTA_STATE_FILE)
+    key = f"{account_key(cli_ctx, client.tenant)}/{client.provider}/{view}"
+    with _lock:
+        previous = load_json(path, {}).get(key) or {}
+    if previous.get("version") != DELTA_STATE_VERSION:
+        previous = {}
+    previous_rows = previous.get("rows", {})
+
+    validator = {"etag": previous.get("etag")}
+    if view == "active":
+        records = client.iter_active(validator=validator)
+    else:
+        records = client.iter_pending(validator=validator)
+
+    rows = {}
+    changes = []
+    for record in records:
+        row_id, row = _snapshot(record)
+        rows[row_id] = row
+        old = previous_rows.get(row_id)
+        if old is None:
+            changes.append((ADDED, record))
+        elif old["fingerprint"] != row["fingerprint"]:
+            changes.append((CHANGED, record))
+
+    if validator.get("modified") is False:
+        logger.debug("%s %s not modified since the last run", client.provider, view)
+        return []
+    changes.extend(
+        (REMOVED, _from_snapshot(row, view, client.provider))
+        for row_id, row in previous_rows.items()
+        if row_id not in rows
+    )
+
+    with _lock:
+        entries = load_json(path, {})
+        entries[key] = {
+            "version": DELTA_STATE_VERSION,
+            "etag": validator.get("etag"),
+            "rows": rows,
+        }
+        save_json(path, entries)
+    return changes
+
+
+def _snapshot(record):
+    """Get the ID of a record and what is kept of it, its fingerprint and the fields to show it."""
+    if isinstance(record, RoleAssignmentRequest):
+        requested_at = _isoformat(record.requested_at)
+        return record.id, {
+            "fingerprint": [record.status, record.sub_status],
+            "fields": [
+                record.id,
+                record.group_name,
+                record.role,
+                requested_at,
+                record.status,
+                record.sub_status,
+                record.reason,
+            ],
+        }
+
+    end = _isoformat(record.end)
+    return record.id, {
+        "fingerprint": [record.status, end],
+        "fields": [
+            record.id,
+            record.resource_id,
+            record.group_name,
+            record.role_definition_id,
+            record.role,
+            record.member_type,
+            end,
+            record.status,
+        ],
+    }
+
+
+def _from_snapshot(row, view, provider):
+    """Recreate the record of a row which has been removed, as it last was."""
+    fields = row["fields"]
+    if view == "active":
+        return RoleAssignment(
+            *fields[1:6],
+            parse_datetime(fields[6]),
+            fields[7],
+            provider=provider,
+            assignment_id=fields[0],
+        )
+    return RoleAssignmentRequest(
+        *fields[:3], parse_datetime(fields[3]), *fields[4:], provider=provider
+    )
+
+
+def _isoformat(dt):
+    return dt.isoformat() if dt else None
@@ -0,0 +1,208 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Phase timing of an az pim command, for `az pim diag`.
+
+The command runs in a fresh Python process with this file as the entry point, so the
+startup the user sees is measured too. It only imports the standard library until the
+Azure CLI is imported as the first timed phase, and marks the rest from the CLI's own
+invocation events and the extension's trace spans.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+# Phases in the order they happen, each running until the next one which was reached
+PHASES = OrderedDict(
+    [
+        ("startup", "Python startup"),
+        ("cli_import", "Azure CLI import"),
+        ("cli_init", "Azure CLI init"),
+        ("extension_import", "Extension import (PimCommandsLoader)"),
+        ("invoke", "Invocation setup"),
+        ("command_table", "Command table load"),
+        ("arguments", "Argument load"),
+        ("parse", "Parser build and argument parsing"),
+        ("command", "Command"),
+        ("transform", "Result conversion"),
+        ("output", "Query, table transformer and output"),
+        ("exit", "Exit"),
+    ]
+)
+
+# Trace spans within the command, grouped by the first word of their name
+SPAN_GROUPS = {
+    "token": "Token acquisition (MSAL)",
+    "graph": "Graph user lookup",
+    "http": "PIM HTTP",
+    "broker": "PIM HTTP via broker",
+    "history": "History sync",
+}
+
+
+def run_diag(cli_ctx, args, profile_file=None, show_output=False):
+    """Run an az pim command in a new process, returning its time in each phase.
+
+    Rows are ranked by time, with the trace spans within the command listed after it.
+    Span times are summed, so exceed the command time when calls run concurrently.
+    With a profile file the run is also profiled with cProfile, and the stats saved.
+    """
+    import subprocess
+    import tempfile
+    from knack.util import CLIError
+
+    if args and args[0] == "az":
+        args = args[1:]
+    if not args or args[0] != "pim":
+        args = ["pim"] + list(args)
+    if len(args) < 2 or args[1] == "diag":
+        raise CLIError("Give the az pim command to diagnose, e.g. --command 'active'")
+
+    extension_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    fd, result_file = tempfile.mkstemp(prefix="pim-diag-", suffix=".json")
+    os.close(fd)
+    try:
+        started = time.time()
+        start = time.perf_counter()
+        process = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                result_file,
+                extension_dir,
+                repr(started),
+                os.path.abspath(profile_file) if profile_file else "",
+                *args,
+            ],
+            stdout=None if show_output else subprocess.DEVNULL,
+            env=dict(os.environ, AZURE_CONFIG_DIR=cli_ctx.config.config_dir),
+            check=False,
+        )
+        total = time.perf_counter() - start
+        with open(result_file, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CLIError(f"Unable to run the command to diagnose: {e}") from e
+    finally:
+        os.remove(result_file)
+
+    if process.returncode:
+        from knack.log import get_logger
+
+        get_logger(__name__).warning(
+            "The command failed with exit code %d, timings are up to the failure",
+            process.returncode,
+        )
+    return _rank(result, total)
+
+
+def _rank(result, total):
+    def row(phase, seconds, calls=None):
+        return OrderedDict(
+            [
+                ("phase", phase),
+                ("ms", round(seconds * 1000, 1)),
+                ("percent", round(100 * seconds / total, 1) if total else None),
+                ("calls", calls),
+            ]
+        )
+
+    rows = []
+    for name, seconds in sorted(result["phases"], key=lambda p: p[1], reverse=True):
+        rows.append(row(PHASES.get(name, name), seconds))
+        if name == "command":
+            for span_name, (calls, seconds) in sorted(
+                result["spans"].items(), key=lambda s: s[1][1], reverse=True
+            ):
+                rows.append(row(f"  {span_name}", seconds, calls))
+    rows.append(row("Total", total))
+    return rows
+
+
+def main():
+    """Run an az command, writing the time spent in each phase to the result file."""
+    start = time.perf_counter()
+    result_file, extension_dir, started, profile_file = sys.argv[1:5]
+    args = sys.argv[5:]
+    # Not this file's directory, where the extension's modules would shadow others
+    sys.path[0] = extension_dir
+
+    marks = [("startup", start - (time.time() - float(started)))]
+
+    def mark(name):
+        if name not in (m[0] for m in marks):
+            marks.append((name, time.perf_counter()))
+
+    profiler = None
+    if profile_file:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    exit_code = 1
+    try:
+        mark("cli_import")
+        from azure.cli.core import get_default_cli
+        from azure.cli.core.commands import events as az_events
+        from knack import events
+
+        mark("cli_init")
+        cli = get_default_cli()
+
+        mark("extension_import")
+        from azext_pim import _trace
+
+        # Record spans without writing a trace file
+        _trace._enabled = True  # pylint: disable=protected-access
+
+        for event, name in (
+            (events.EVENT_INVOKER_PRE_CMD_TBL_CREATE, "command_table"),
+            (az_events.EVENT_INVOKER_PRE_LOAD_ARGUMENTS, "arguments"),
+            (az_events.EVENT_INVOKER_POST_LOAD_ARGUMENTS, "parse"),
+            (events.EVENT_INVOKER_POST_PARSE_ARGS, "command"),
+            (events.EVENT_INVOKER_TRANSFORM_RESULT, "transform"),
+            (events.EVENT_INVOKER_FILTER_RESULT, "output"),
+            (events.EVENT_CLI_POST_EXECUTE, "exit"),
+        ):
+            cli.register_event(event, lambda _, name=name, **__: mark(name))
+
+        mark("invoke")
+        exit_code = cli.invoke(args, out_file=sys.stdout)
+    finally:
+        end = time.perf_counter()
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+
+        trace = sys.modules.get("azext_pim._trace")
+        spans = {}
+        for record in trace._spans if trace else []:  # pylint: disable=protected-access
+            group = SPAN_GROUPS.get(record["name"].split()[0], record["name"])
+            calls, seconds = spans.get(group, (0, 0))
+            spans[group] = (calls + 1, seconds + record["duration"])
+
+        ends = [m[1] for m in marks[1:]] + [end]
+        with open(result_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "phases": [
+                        (name, finish - begin)
+                        for (name, begin), finish in zip(marks, ends)
+                    ],
+                    "spans": spans,
+                    "exit_code": exit_code,
+                },
+                f,
+            )
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
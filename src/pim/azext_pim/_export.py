@@ -0,0 +1,191 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import csv
+import json
+import os
+import sys
+from collections import OrderedDict
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+EXPORT_STATE_FILE = "export.json"
+
+EXPORT_KINDS = ("eligible", "active", "requests")
+
+# Every row has the same columns, so the CSV header is known before the first row
+EXPORT_COLUMNS = (
+    "kind",
+    "provider",
+    "groupName",
+    "role",
+    "memberType",
+    "status",
+    "subStatus",
+    "expires",
+    "requestedAt",
+    "reason",
+    "id",
+    "resourceId",
+    "roleDefinitionId",
+)
+
+# Fields of eligible and active assignments to export, wider than the commands use
+EXPORT_ASSIGNMENT_SELECT = ["id", "resourceId", "memberType", "endDateTime", "status"]
+
+
+def run_export(cli_ctx, path, export_format, kinds, providers, resume=False):
+    """Write the kinds of rows for each provider to a file, or stdout, one row at a time.
+
+    The position in the PIM API pages and the file is saved at the start of each page,
+    so after an interruption the export resumes from the page it was on, with the file
+    truncated to that point. Returns the number of rows written by kind.
+    """
+    from azext_pim._cache import cache_path, load_json, save_json
+    from azext_pim._session import DEFAULT_DEADLINE, extend_deadline
+    from azext_pim._client_factory import cf_pim
+    from azext_pim.pim import PROVIDERS
+
+    state_path = cache_path(cli_ctx, EXPORT_STATE_FILE)
+    sections = [(kind, provider) for kind in kinds for provider in providers]
+    if path:
+        path = os.path.abspath(path)
+
+    if resume:
+        if not path:
+            raise CLIError("Only an export to a file can be resumed")
+        state = load_json(state_path)
+        if not state or state.get("file") != path:
+            raise CLIError(f"No interrupted export of {path} to resume")
+        if state["format"] != export_format or state["sections"] != [
+            list(section) for section in sections
+        ]:
+            raise CLIError(
+                "The interrupted export was of different rows, or in another format"
+            )
+        out = open(  # pylint: disable=consider-using-with
+            path, "r+", encoding="utf-8", newline=""
+        )
+        out.seek(state["offset"])
+        out.truncate()
+        logger.warning(
+            "Resuming export of %s from row %d", path, sum(state["rows"].values())
+        )
+    else:
+        state = {
+            "file": path,
+            "format": export_format,
+            "sections": [list(section) for section in sections],
+            "section": 0,
+            "position": {},
+            "offset": 0,
+            "rows": {kind: 0 for kind in kinds},
+        }
+        # pylint: disable-next=consider-using-with
+        out = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+
+    write = _get_writer(out, export_format, header=not resume)
+    deadline = cli_ctx.config.getfloat("pim", "deadline", fallback=DEFAULT_DEADLINE)
+
+    def checkpoint():
+        # Rows are only flushed here, so a page is either all in the file or redone
+        out.flush()
+        if path:
+            state["offset"] = out.tell()
+            save_json(state_path, state)
+        # Long exports keep going as long as each page arrives within the deadline
+        extend_deadline(deadline)
+
+    try:
+        for index in range(state["section"], len(sections)):
+            kind, provider = sections[index]
+            if index != state["section"]:
+                state.update(section=index, position={})
+            client = cf_pim(cli_ctx, provider=PROVIDERS[provider])
+            position = state["position"]
+            page_url = None
+            checkpoint()
+            for record in _iter_records(client, kind, position):
+                if position["url"] != page_url:
+                    if page_url is not None:
+                        checkpoint()
+                    page_url = position["url"]
+                write(_export_row(kind, provider, record))
+                state["rows"][kind] += 1
+        out.flush()
+    except (CLIError, KeyboardInterrupt):
+        if path:
+            logger.warning(
+                "Export interrupted, run the same command with --resume to continue"
+            )
+        raise
+    finally:
+        if path:
+            out.close()
+
+    if path:
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+    return state["rows"]
+
+
+def _iter_records(client, kind, position):
+    if kind == "eligible":
+        return client.iter_eligible(position, select=EXPORT_ASSIGNMENT_SELECT)
+    if kind == "active":
+        return client.iter_active(position, select=EXPORT_ASSIGNMENT_SELECT)
+    # Requests with every status, not only those pending approval
+    return client.iter_pending(None, position)
+
+
+def _get_writer(out, export_format, header=True):
+    """Get a function writing one row to the file, in NDJSON or CSV."""
+    if export_format == "csv":
+        writer = csv.DictWriter(out, EXPORT_COLUMNS, lineterminator="\n")
+        if header:
+            writer.writeheader()
+        return writer.writerow
+
+    def write_json(row):
+        out.write(json.dumps(row))
+        out.write("\n")
+
+    return write_json
+
+
+def _export_row(kind, provider, record):
+    """Convert a record to an export row, with times in ISO 8601 and empty columns as None."""
+    row = OrderedDict.fromkeys(EXPORT_COLUMNS)
+    row.update(
+        kind=kind,
+        provider=provider,
+        groupName=record.group_name,
+        role=record.role,
+        status=record.status,
+    )
+    if kind == "requests":
+        row.update(
+            subStatus=record.sub_status,
+            requestedAt=_isoformat(record.requested_at),
+            reason=record.reason,
+            id=record.id,
+        )
+    else:
+        row.update(
+            memberType=record.member_type,
+            expires=_isoformat(record.end),
+            id=record.id,
+            resourceId=record.resource_id,
+            roleDefinitionId=record.role_definition_id,
+        )
+    return row
+
+
+def _isoformat(dt):
+    return dt.isoformat() if dt else None
@@ -0,0 +1,67 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from collections import OrderedDict
+
+
+def transform_request_output(result):
+    """Table output for pim request, which returns a list when activating many groups."""
+    if not isinstance(result, list):
+        return _request_row(result)
+
+    return [
+        OrderedDict(list(_request_row(row).items()) + [("Error", row.get("error"))])
+        for row in result
+    ]
+
+
+def _request_row(result):
+    return OrderedDict(
+        [
+            ("GroupName", result["groupName"]),
+            ("Role", result["role"]),
+            ("Status", result["status"]),
+            ("Reason", result["reason"]),
+            ("Duration", result["duration"]),
+        ]
+    )
+
+
+def transform_history_output(result):
+    """Table output for pim history, which has other columns with --summary."""
+    if result and "requests" in result[0]:
+        columns = [
+            ("GroupName", "groupName"),
+            ("Role", "role"),
+            ("Requests", "requests"),
+            ("Provisioned", "provisioned"),
+            ("LastRequestedAt", "lastRequestedAt"),
+        ]
+    else:
+        columns = [
+            ("GroupName", "groupName"),
+            ("Role", "role"),
+            ("RequestedAt", "requestedAt"),
+            ("Status", "status"),
+            ("Reason", "reason"),
+        ]
+    return tenant_table(columns)(result)
+
+
+def tenant_table(columns):
+    """Table output with the (heading, key) columns, led by Tenant, Provider and Change columns when present."""
+
+    def transform(result):
+        return [
+            OrderedDict(
+                ([("Tenant", row["tenant"])] if "tenant" in row else [])
+                + ([("Provider", row["provider"])] if "provider" in row else [])
+                + ([("Change", row["change"])] if "change" in row else [])
+                + [(heading, row.get(key)) for heading, key in columns]
+            )
+            for row in result
+        ]
+
+    return transform
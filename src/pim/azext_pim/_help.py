@@ -22,6 +22,8 @@ helps["pim list"] = """
     examples:
         - name: List all eligible PIM groups
           text: az pim list
+        - name: List eligible groups, Entra roles and Azure resource roles together
+          text: az pim list --provider groups roles resources -o table
 """
 
 helps["pim active"] = """
@@ -32,6 +34,8 @@ helps["pim active"] = """
     examples:
         - name: List active PIM group activations
           text: az pim active
+        - name: Show only activations which started, changed or ended since the last check
+          text: az pim active --since-last
 """
 
 helps["pim pending"] = """
@@ -42,6 +46,8 @@ helps["pim pending"] = """
     examples:
         - name: List pending activation requests
           text: az pim pending
+        - name: Show only requests made, approved or denied since the last check
+          text: az pim pending --since-last
 """
 
 helps["pim status"] = """
@@ -56,10 +62,13 @@ helps["pim status"] = """
 
 helps["pim request"] = """
     type: command
-    short-summary: Request activation for a PIM group with a specified role.
+    short-summary: Request activation for one or more PIM groups with a specified role.
     long-summary: |
         Submit an activation request for an eligible PIM group. Requires specifying the group name,
         a reason for activation, and optionally the duration and role type.
+        Several groups can be activated at once by passing multiple names, glob patterns, regexes
+        prefixed with 're:' or an @file with one name per line. Eligibility is fetched once and the
+        requests are submitted concurrently, with one result row per group.
     examples:
         - name: Request activation for a PIM group as Member for 8 hours
           text: az pim request --name "My-PIM-Group" --reason "Incident response" --duration 8
@@ -67,4 +76,131 @@ helps["pim request"] = """
           text: az pim request -n "My-PIM-Group" -r "Admin tasks" --role Owner
         - name: Request activation for 30 minutes
           text: az pim request -n "My-PIM-Group" -r "Quick check" -d 0.5
+        - name: Request activation for several PIM groups at once
+          text: az pim request -n "Prod-Web" "Prod-Db" -r "Incident response"
+        - name: Request activation for all groups matching a pattern, listed in a file, or a regex
+          text: |
+            az pim request -n "Prod-*" -r "Incident response"
+            az pim request -n @groups.txt -r "Incident response" --max-parallel 8
+            az pim request -n "re:Prod-(Web|Db)" -r "Incident response"
+        - name: Request activation and wait for it to be approved
+          text: az pim request -n "My-PIM-Group" -r "Incident response" --wait
+        - name: Request activation of an Entra role, named by the directory it is in
+          text: az pim request -n "Contoso" --role "Global Reader" -r "Audit" --provider roles
+"""
+
+helps["pim wait"] = """
+    type: command
+    short-summary: Wait for a PIM group activation request to be approved and active.
+    long-summary: |
+        Poll the latest activation request for a PIM group until it is provisioned, fails or is denied,
+        or the timeout is reached. Polling starts every few seconds and backs off the longer it waits.
+    examples:
+        - name: Wait for a pending activation request
+          text: az pim wait --name "My-PIM-Group"
+        - name: Wait up to 10 minutes for an Owner activation request
+          text: az pim wait -n "My-PIM-Group" --role Owner --timeout 600
+"""
+
+helps["pim keepalive"] = """
+    type: command
+    short-summary: Keep active PIM group activations alive by renewing them before they expire.
+    long-summary: |
+        Run in the foreground, renewing each active activation shortly before it expires with the reason
+        of the original request, until it has been renewed the maximum number of times or Ctrl+C is pressed.
+        Rather than polling, it sleeps until the next activation is due for renewal. Each renewal activates the
+        group again, and is only counted once the new end time is seen. A renewal refused while the activation
+        is still active is tried again once it ends, so access can lapse briefly until the renewal takes effect.
+    examples:
+        - name: Keep all active Member activations alive
+          text: az pim keepalive
+        - name: Keep matching groups alive, renewing 15 minutes before expiry at most 3 times
+          text: az pim keepalive -n "Prod-*" --margin 15 --max-renewals 3
+        - name: Keep an Owner activation alive with a new reason and 4 hour renewals
+          text: az pim keepalive -n "My-PIM-Group" --role Owner -r "Maintenance window" -d 4
+"""
+
+helps["pim prompt"] = """
+    type: command
+    short-summary: Show active PIM groups for a shell prompt or status bar, without calling the PIM API.
+    long-summary: |
+        Read the active groups, with their time remaining, and the number of pending requests from a local
+        state file. When the state is older than the `pim.prompt_refresh_interval` setting (default 60 seconds)
+        it is refreshed in the background, with a file lock so only one refresh runs however many shells ask.
+        Starting the Azure CLI takes much longer than reading the state, so for prompts run the
+        azext_pim/prompt.py file in the extension directory directly with Python instead.
+    examples:
+        - name: Show the prompt segment as plain text
+          text: az pim prompt -o tsv
+        - name: Refresh the state now and show it with a custom format
+          text: az pim prompt --refresh --format "PIM: {active_count} active" -o tsv
+        - name: Use in a bash prompt without starting the Azure CLI
+          text: PS1='$(python ~/.azure/cliextensions/pim/azext_pim/prompt.py) \\$ '
+"""
+
+helps["pim broker"] = """
+    type: command
+    short-summary: Run a local broker which shares PIM API calls between concurrent az pim commands.
+    long-summary: |
+        Listen on a Unix domain socket in the Azure CLI config directory, readable only by the current user.
+        While it runs, other az pim commands send their PIM API calls through it instead of each acquiring
+        a token, looking up the user and opening connections. Identical reads which are in flight at the
+        same time are made once and the response shared. Commands call the API directly when no broker
+        is running, or when the `pim.use_broker` setting is false. Not available on Windows.
+    examples:
+        - name: Run the broker until Ctrl+C is pressed
+          text: az pim broker
+        - name: Run the broker in the background of a CI job, stopping after 10 idle minutes
+          text: az pim broker --idle-timeout 600 --only-show-errors &
+"""
+
+helps["pim export"] = """
+    type: command
+    short-summary: Export eligible and active assignments and all activation requests as NDJSON or CSV.
+    long-summary: |
+        Write one row for each eligible assignment, active assignment and activation request with any status,
+        following the PIM API pages and writing each row as it arrives, so memory use stays the same however
+        many there are. Each row has a kind column of eligible, active or requests. When writing to a file
+        the position is saved at the start of every page, and an interrupted export continues from that page
+        with --resume.
+    examples:
+        - name: Export everything for groups to stdout as NDJSON
+          text: az pim export
+        - name: Export requests for groups and Entra roles to a CSV file
+          text: az pim export --include requests --provider groups roles --format csv -f requests.csv
+        - name: Continue an export which was interrupted
+          text: az pim export --format csv -f review.csv --resume
+"""
+
+helps["pim history"] = """
+    type: command
+    short-summary: Show past PIM activation requests from a local store, synced incrementally.
+    long-summary: |
+        Requests are kept in a SQLite database in the extension's cache directory. Each sync only fetches
+        requests made since the latest one stored, or since the earliest recent one still pending, so the full
+        history is downloaded once. The store is synced when it is older than the `pim.history_sync_interval`
+        setting (default 300 seconds) or with --refresh, and otherwise answers without calling the PIM API.
+    examples:
+        - name: Show requests made in the last 90 days
+          text: az pim history
+        - name: How often a group was activated in the last 30 days
+          text: az pim history -n "My-PIM-Group" --days 30 --summary
+        - name: Show denied requests for matching groups
+          text: az pim history -n "Prod-*" --status Denied
+"""
+
+helps["pim diag"] = """
+    type: command
+    short-summary: Run an az pim command and show how long each phase of it took.
+    long-summary: |
+        Run the command in a new process, timing Python and Azure CLI startup, the extension import, the
+        command table and argument loading, the command itself, and the query, table transformer and output.
+        The command's time is broken down into token acquisition, the Graph user lookup and PIM HTTP calls,
+        summed over calls, so these can add up to more than the command when calls run concurrently. Phases
+        are ranked by time. Add --profile-file to also profile the run with cProfile, which slows it down.
+    examples:
+        - name: Show where the time goes when listing active groups as a table
+          text: az pim diag --command "active -o table" -o table
+        - name: Profile a status run and save the stats to share in a bug report
+          text: az pim diag -c "status" --profile-file status.pstats -o table
 """
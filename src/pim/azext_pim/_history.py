@@ -0,0 +1,220 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_DB_FILE = "history.db"
+
+# Bumped when the tables change, the store is only a cache so is rebuilt from the API
+SCHEMA_VERSION = 1
+
+# Default for the `pim.history_sync_interval` setting, in seconds
+DEFAULT_HISTORY_SYNC_INTERVAL = 300
+
+# Requests not yet provisioned or failed are synced again for this many seconds after
+# they were made, so approvals and denials of recent requests are picked up
+RESYNC_WINDOW = 7 * 24 * 60 * 60
+
+# Rows written to the store at a time while syncing
+SYNC_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id TEXT NOT NULL,
+    account TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    group_name TEXT,
+    role TEXT,
+    requested_at REAL,
+    status TEXT,
+    sub_status TEXT,
+    reason TEXT,
+    PRIMARY KEY (account, provider, id)
+);
+CREATE INDEX IF NOT EXISTS requests_group_role
+    ON requests (account, group_name, role COLLATE NOCASE, requested_at);
+CREATE INDEX IF NOT EXISTS requests_status
+    ON requests (account, sub_status COLLATE NOCASE, requested_at);
+CREATE INDEX IF NOT EXISTS requests_requested_at ON requests (account, requested_at);
+CREATE TABLE IF NOT EXISTS sync (
+    account TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (account, provider)
+);
+"""
+
+
+def connect(cli_ctx):
+    """Open the history store in the extension's cache directory, creating it if needed."""
+    from azext_pim._cache import cache_path
+
+    db = sqlite3.connect(cache_path(cli_ctx, HISTORY_DB_FILE), timeout=30)
+    if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with db:
+            db.execute("DROP TABLE IF EXISTS requests")
+            db.execute("DROP TABLE IF EXISTS sync")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    db.executescript(SCHEMA)
+    return db
+
+
+def sync(cli_ctx, db, client, account, refresh=False):
+    """Fetch the requests made since the watermark for a client's provider into the store.
+
+    The watermark is the latest request stored, or the earliest recent request which has
+    not finished, and is pushed into the $filter so older requests are not downloaded
+    again. Rows are written a batch at a time, so the store is not locked while pages
+    are fetched, and only requests up to the last completed sync count toward the
+    watermark, so a sync which was interrupted is fetched again. Skipped if the provider
+    was synced within the `pim.history_sync_interval` setting, unless refreshing.
+    Returns the number of requests fetched, or None if skipped.
+    """
+    from azext_pim._trace import span
+    from azext_pim.client import REQUEST_FAILED_STATUSES, REQUEST_SUCCEEDED_STATUSES
+
+    provider = client.provider
+    interval = cli_ctx.config.getfloat(
+        "pim", "history_sync_interval", fallback=DEFAULT_HISTORY_SYNC_INTERVAL
+    )
+    row = db.execute(
+        "SELECT synced_at FROM sync WHERE account = ? AND provider = ?",
+        (account, provider),
+    ).fetchone()
+    now = time.time()
+    if row and not refresh and now - row[0] < interval:
+        return None
+
+    since = None
+    if row:
+        finished = REQUEST_SUCCEEDED_STATUSES + REQUEST_FAILED_STATUSES
+        latest, unfinished = db.execute(
+            f"""
+            SELECT
+                MAX(requested_at),
+                MIN(CASE WHEN requested_at >= ? AND LOWER(COALESCE(sub_status, '')) NOT IN
+                    ({', '.join('?' * len(finished))}) THEN requested_at END)
+            FROM requests WHERE account = ? AND provider = ? AND requested_at <= ?
+            """,
+            (
+                now - RESYNC_WINDOW,
+                *(s.lower() for s in finished),
+                account,
+                provider,
+                row[0],
+            ),
+        ).fetchone()
+        watermark = unfinished if unfinished is not None else latest
+        if watermark is not None:
+            since = datetime.fromtimestamp(watermark, timezone.utc)
+
+    count = 0
+    with span(cli_ctx, "history sync", provider=provider, since=str(since)):
+        batch = []
+        for request in client.iter_pending(None, since=since):
+            batch.append(_to_row(request, account, provider))
+            if len(batch) >= SYNC_BATCH_SIZE:
+                with db:
+                    _write_rows(db, batch)
+                count += len(batch)
+                batch = []
+        with db:
+            _write_rows(db, batch)
+            db.execute(
+                "INSERT OR REPLACE INTO sync (account, provider, synced_at) VALUES (?, ?, ?)",
+                (account, provider, now),
+            )
+        count += len(batch)
+    logger.debug("Synced %d %s request(s) since %s", count, provider, since)
+    return count
+
+
+def query(db, account, providers, name=None, role=None, status=None, days=None):
+    """Get the stored requests, newest first, optionally filtered.
+
+    The name can be a glob pattern, and the status matches the status or sub status.
+    """
+    clauses, params = _filters(account, providers, name, role, status, days)
+    return db.execute(
+        f"""
+        SELECT provider, group_name, role, requested_at, status, sub_status, reason
+        FROM requests WHERE {' AND '.join(clauses)}
+        ORDER BY requested_at DESC
+        """,
+        params,
+    )
+
+
+def summarize(db, account, providers, name=None, role=None, status=None, days=None):
+    """Count the stored requests for each group and role, most requested first."""
+    from azext_pim.client import REQUEST_SUCCEEDED_STATUSES
+
+    clauses, params = _filters(account, providers, name, role, status, days)
+    return db.execute(
+        f"""
+        SELECT
+            provider,
+            group_name,
+            role,
+            COUNT(*),
+            SUM(LOWER(sub_status) IN ({', '.join('?' * len(REQUEST_SUCCEEDED_STATUSES))})),
+            MAX(requested_at)
+        FROM requests WHERE {' AND '.join(clauses)}
+        GROUP BY provider, group_name, role COLLATE NOCASE
+        ORDER BY COUNT(*) DESC, MAX(requested_at) DESC
+        """,
+        (*(s.lower() for s in REQUEST_SUCCEEDED_STATUSES), *params),
+    )
+
+
+def _filters(account, providers, name, role, status, days):
+    clauses = [
+        "account = ?",
+        f"provider IN ({', '.join('?' * len(providers))})",
+    ]
+    params = [account, *providers]
+    if name:
+        clauses.append("group_name GLOB ?")
+        params.append(name)
+    if role:
+        clauses.append("role = ? COLLATE NOCASE")
+        params.append(role)
+    if status:
+        clauses.append("(status = ? COLLATE NOCASE OR sub_status = ? COLLATE NOCASE)")
+        params.extend([status, status])
+    if days:
+        clauses.append("requested_at >= ?")
+        params.append(time.time() - days * 24 * 60 * 60)
+    return clauses, params
+
+
+def _to_row(request, account, provider):
+    return (
+        request.id,
+        account,
+        provider,
+        request.group_name,
+        request.role,
+        request.requested_at.timestamp() if request.requested_at else None,
+        request.status,
+        request.sub_status,
+        request.reason,
+    )
+
+
+def _write_rows(db, rows):
+    db.executemany(
+        """
+        INSERT OR REPLACE INTO requests
+            (id, account, provider, group_name, role, requested_at, status, sub_status, reason)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
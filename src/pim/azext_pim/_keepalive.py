@@ -0,0 +1,175 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from knack.log import get_logger
+from knack.util import CLIError
+from azext_pim.client import (
+    get_sub_status,
+    has_failed,
+    has_succeeded,
+)
+
+logger = get_logger(__name__)
+
+# Seconds between checks of a renewal which has not taken effect yet
+RECHECK_INTERVAL = 60
+
+# Seconds a provisioned renewal has to show up in the active assignments
+SETTLE_TIME = 5 * 60
+
+# Renewal attempts which fail in a row before an activation is given up on
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+def run_keepalive(client, activations, margin, duration, max_renewals, max_parallel):
+    """Renew activations shortly before they expire, until they reach the renewal limit.
+
+    Activations are held in a queue ordered by when they next need attention, and the
+    process sleeps until the earliest of those rather than polling on an interval. Each
+    activation is a dict with the groupName, role, assignment, reason and end (a POSIX
+    timestamp), and is updated with the renewals made and the latest status.
+    """
+    sequence = itertools.count()
+    queue = []
+    for activation in activations:
+        activation.update(renewals=0, failures=0, request=None)
+        activation["status"] = "Active"
+        heapq.heappush(queue, (activation["end"] - margin, next(sequence), activation))
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        while queue:
+            due_at, _, next_activation = queue[0]
+            delay = due_at - time.time()
+            if delay > 0:
+                logger.warning(
+                    "Next renewal check for %s (%s) in %dm",
+                    next_activation["groupName"],
+                    next_activation["role"],
+                    delay // 60,
+                )
+                time.sleep(delay)
+
+            due = []
+            while queue and queue[0][0] <= time.time():
+                due.append(heapq.heappop(queue)[2])
+
+            list(
+                executor.map(
+                    lambda activation: _renew(
+                        client, activation, duration, max_renewals
+                    ),
+                    due,
+                )
+            )
+
+            # Re-read the state of every activation once, rather than one by one
+            ends = _get_active_ends(client)
+            for activation in due:
+                due_at = _reschedule(activation, ends, margin)
+                if due_at is not None:
+                    heapq.heappush(queue, (due_at, next(sequence), activation))
+
+    return activations
+
+
+def _renew(client, activation, duration, max_renewals):
+    """Submit a renewal for an activation, or check on one already submitted."""
+    request = activation["request"]
+    if request:
+        # Wait for a submitted renewal to take effect, rather than sending another
+        if not has_succeeded(request):
+            try:
+                activation["request"] = client.get_request(request.id)
+            except CLIError as e:
+                logger.warning(
+                    "Unable to check renewal of %s: %s", activation["groupName"], e
+                )
+        return
+
+    if activation["renewals"] >= max_renewals:
+        activation["status"] = "Renewal limit reached"
+        return
+
+    # Activate again with the original reason, as the activation was first requested
+    try:
+        activation["request"] = client.request(
+            activation["assignment"], activation["reason"], duration
+        )
+        activation["submitted"] = time.time()
+        activation["status"] = get_sub_status(activation["request"])
+        logger.warning(
+            "Submitted renewal of %s (%s): %s",
+            activation["groupName"],
+            activation["role"],
+            activation["status"],
+        )
+    except CLIError as e:
+        activation["status"] = f"Renewal failed: {e}"
+        # Refusals while the activation is still active are retried when it ends
+        if time.time() >= activation["end"]:
+            activation["failures"] += 1
+        logger.warning(
+            "Unable to renew %s (%s): %s",
+            activation["groupName"],
+            activation["role"],
+            e,
+        )
+
+
+def _reschedule(activation, ends, margin):
+    """Update an activation from the latest state, returning when it is next due or None."""
+    now = time.time()
+    end = ends.get(_activation_key(activation))
+    request = activation["request"]
+    if request and has_failed(request):
+        activation["status"] = f"Renewal {get_sub_status(request)}"
+        return None
+
+    if end and end > activation["end"]:
+        # The renewal has taken effect, and is only counted once its new end is seen
+        if request:
+            activation["renewals"] += 1
+        activation.update(end=end, request=None, failures=0, status="Active")
+        return end - margin
+
+    if activation["status"] == "Renewal limit reached":
+        return None
+
+    if not request and activation["status"].startswith("Renewal failed"):
+        if now < activation["end"]:
+            # Refused while still active, e.g. as it cannot be activated again yet, so
+            # try once it has ended rather than every minute until then
+            return activation["end"]
+
+    if request:
+        settled = now - activation["submitted"] >= SETTLE_TIME
+        if not (has_succeeded(request) and end is None and settled):
+            # Renewal is still pending, e.g. awaiting approval, or not yet visible
+            return now + RECHECK_INTERVAL
+        # Provisioned a while ago, yet nothing is active now the old activation has ended
+        activation.update(request=None, status="Renewal not active")
+        activation["failures"] += 1
+
+    if activation["failures"] >= MAX_CONSECUTIVE_FAILURES:
+        return None
+    return now + RECHECK_INTERVAL
+
+
+def _get_active_ends(client):
+    """Get the end of each active assignment as a POSIX timestamp, keyed by group and role."""
+    ends = {}
+    for assignment in client.iter_active():
+        if assignment.end:
+            key = (assignment.group_name, assignment.role.lower())
+            ends[key] = assignment.end.timestamp()
+    return ends
+
+
+def _activation_key(activation):
+    return (activation["groupName"], activation["role"].lower())
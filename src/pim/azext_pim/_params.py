@@ -5,14 +5,51 @@
 
 
 def load_arguments(self, _):
-    with self.argument_context("pim list") as c:
-        pass
+    from azure.cli.core.commands.parameters import get_enum_type
 
-    with self.argument_context("pim active") as c:
-        pass
+    provider_type = get_enum_type(["groups", "roles", "resources"])
 
-    with self.argument_context("pim pending") as c:
-        pass
+    for scope in ["pim list", "pim active", "pim pending", "pim status"]:
+        with self.argument_context(scope) as c:
+            c.argument(
+                "provider",
+                options_list=["--provider", "-p"],
+                nargs="+",
+                arg_type=provider_type,
+                help="PIM provider(s) to query: groups, Entra roles or Azure resources, defaults to groups. "
+                "Several are queried concurrently, with a provider column in the results",
+            )
+            c.argument(
+                "tenant",
+                options_list=["--tenant", "-t"],
+                nargs="+",
+                help="ID(s) of the tenant(s) to query, instead of the current account's tenant. "
+                "Several are queried concurrently, with a tenant column in the results",
+            )
+            c.argument(
+                "all_tenants",
+                options_list=["--all-tenants"],
+                action="store_true",
+                help="Query every tenant the current account is logged in to, concurrently",
+            )
+
+    with self.argument_context("pim list") as c:
+        c.argument(
+            "refresh",
+            options_list=["--refresh"],
+            action="store_true",
+            help="Ignore the local eligibility cache and fetch from the PIM API",
+        )
+
+    for scope in ["pim active", "pim pending"]:
+        with self.argument_context(scope) as c:
+            c.argument(
+                "since_last",
+                options_list=["--since-last"],
+                action="store_true",
+                help="Only show the rows added, changed or removed since the last run with --since-last, "
+                "with a change column",
+            )
 
     with self.argument_context("pim status") as c:
         pass
@@ -21,7 +58,9 @@ def load_arguments(self, _):
         c.argument(
             "name",
             options_list=["--name", "-n"],
-            help="Name of the PIM group to request activation for",
+            nargs="+",
+            help="Name of the PIM group(s) to request activation for. Accepts multiple space separated names, "
+            "glob patterns (e.g. 'Prod-*'), regexes prefixed with 're:', or @file with one name per line",
             required=True,
         )
         c.argument(
@@ -43,3 +82,231 @@ def load_arguments(self, _):
             help='Role name to activate (e.g., "Member", "Owner")',
             default="Member",
         )
+        c.argument(
+            "max_parallel",
+            options_list=["--max-parallel"],
+            type=int,
+            help="Maximum number of activation requests to submit concurrently",
+            default=4,
+        )
+        c.argument(
+            "refresh",
+            options_list=["--refresh"],
+            action="store_true",
+            help="Ignore the local eligibility cache and fetch from the PIM API",
+        )
+        c.argument(
+            "wait",
+            options_list=["--wait"],
+            action="store_true",
+            help="Wait until the activation is approved and active before returning",
+        )
+        c.argument(
+            "wait_timeout",
+            options_list=["--wait-timeout"],
+            type=int,
+            help="Maximum time in seconds to wait when using --wait",
+            default=3600,
+        )
+        c.argument(
+            "provider",
+            options_list=["--provider", "-p"],
+            nargs="+",
+            arg_type=provider_type,
+            help="PIM provider(s) the names are eligible in: groups, Entra roles or Azure resources, "
+            "defaults to groups. Each activation is requested from the provider its eligibility came from",
+        )
+
+    with self.argument_context("pim wait") as c:
+        c.argument(
+            "name",
+            options_list=["--name", "-n"],
+            help="Name of the PIM group to wait for",
+            required=True,
+        )
+        c.argument(
+            "role",
+            options_list=["--role"],
+            help='Role name of the activation request (e.g., "Member", "Owner")',
+            default="Member",
+        )
+        c.argument(
+            "timeout",
+            options_list=["--timeout"],
+            type=int,
+            help="Maximum time in seconds to wait",
+            default=3600,
+        )
+        c.argument(
+            "provider",
+            options_list=["--provider", "-p"],
+            arg_type=provider_type,
+            help="PIM provider of the activation request: groups, Entra roles or Azure resources",
+            default="groups",
+        )
+
+    with self.argument_context("pim keepalive") as c:
+        c.argument(
+            "name",
+            options_list=["--name", "-n"],
+            nargs="+",
+            help="Name of the active PIM group(s) to keep alive, defaults to all. Accepts glob patterns, "
+            "regexes prefixed with 're:', or @file with one name per line",
+        )
+        c.argument(
+            "reason",
+            options_list=["--reason", "-r"],
+            help="Reason for renewing, defaults to the reason of the latest activation request",
+        )
+        c.argument(
+            "duration",
+            options_list=["--duration", "-d"],
+            type=float,
+            help="Duration of each renewal in hours",
+            default=12,
+        )
+        c.argument(
+            "role",
+            options_list=["--role"],
+            help='Role name of the activations (e.g., "Member", "Owner")',
+            default="Member",
+        )
+        c.argument(
+            "margin",
+            options_list=["--margin"],
+            type=float,
+            help="Minutes before expiry to renew an activation",
+            default=10,
+        )
+        c.argument(
+            "max_renewals",
+            options_list=["--max-renewals"],
+            type=int,
+            help="Maximum number of times to renew each activation",
+            default=5,
+        )
+        c.argument(
+            "max_parallel",
+            options_list=["--max-parallel"],
+            type=int,
+            help="Maximum number of renewal requests to submit concurrently",
+            default=4,
+        )
+
+    with self.argument_context("pim export") as c:
+        c.argument(
+            "output_file",
+            options_list=["--file", "-f"],
+            help="File to write the rows to, instead of stdout. Needed to resume",
+        )
+        c.argument(
+            "export_format",
+            options_list=["--format"],
+            arg_type=get_enum_type(["ndjson", "csv"]),
+            help="Write one JSON object per line, or CSV with a header row",
+            default="ndjson",
+        )
+        c.argument(
+            "include",
+            options_list=["--include"],
+            nargs="+",
+            arg_type=get_enum_type(["eligible", "active", "requests"]),
+            help="Rows to export, defaults to eligible and active assignments and requests with any status",
+        )
+        c.argument(
+            "provider",
+            options_list=["--provider", "-p"],
+            nargs="+",
+            arg_type=provider_type,
+            help="PIM provider(s) to export: groups, Entra roles or Azure resources, defaults to groups",
+        )
+        c.argument(
+            "resume",
+            options_list=["--resume"],
+            action="store_true",
+            help="Continue an interrupted export to the same file from the page it stopped on",
+        )
+
+    with self.argument_context("pim history") as c:
+        c.argument(
+            "name",
+            options_list=["--name", "-n"],
+            help="Name of the PIM group to show requests for, which may be a glob pattern (e.g. 'Prod-*')",
+        )
+        c.argument(
+            "role",
+            options_list=["--role"],
+            help='Role name to show requests for (e.g., "Member", "Owner")',
+        )
+        c.argument(
+            "status",
+            options_list=["--status"],
+            help="Status or sub status to show requests with (e.g., Provisioned, Denied)",
+        )
+        c.argument(
+            "days",
+            options_list=["--days"],
+            type=int,
+            help="Only show requests made in this many days",
+            default=90,
+        )
+        c.argument(
+            "provider",
+            options_list=["--provider", "-p"],
+            nargs="+",
+            arg_type=provider_type,
+            help="PIM provider(s) to show requests for: groups, Entra roles or Azure resources, defaults to groups",
+        )
+        c.argument(
+            "refresh",
+            options_list=["--refresh"],
+            action="store_true",
+            help="Sync with the PIM API even if it was synced recently",
+        )
+        c.argument(
+            "summary",
+            options_list=["--summary"],
+            action="store_true",
+            help="Count the requests for each group and role, and how many were provisioned",
+        )
+
+    with self.argument_context("pim diag") as c:
+        c.argument(
+            "diag_command",
+            options_list=["--command", "-c"],
+            help="The az pim command to run, with its arguments, e.g. 'status -o table'",
+            required=True,
+        )
+        c.argument(
+            "profile_file",
+            options_list=["--profile-file"],
+            help="Also profile the run with cProfile, saving the stats to this file for pstats or snakeviz",
+        )
+        c.argument(
+            "show_output",
+            options_list=["--show-output"],
+            action="store_true",
+            help="Show the output of the command as well, rather than discarding it",
+        )
+
+    with self.argument_context("pim broker") as c:
+        c.argument(
+            "idle_timeout",
+            options_list=["--idle-timeout"],
+            type=int,
+            help="Stop after this many seconds without a call, or 0 to run until Ctrl+C is pressed",
+            default=0,
+        )
+
+    with self.argument_context("pim prompt") as c:
+        c.argument(
+            "refresh",
+            options_list=["--refresh"],
+            action="store_true",
+            help="Update the state file from the PIM API before showing it, unless another refresh is running",
+        )
+        c.argument(
+            "prompt_format",
+            options_list=["--format"],
+            help="Template for the output, using the {active}, {active_count}, {pending} and {pending_count} fields",
+        )
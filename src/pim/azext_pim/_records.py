@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from datetime import datetime, timezone
+
+
+class RoleAssignment:
+    """An eligible or active role assignment, holding only the fields the commands use.
+
+    The group name is the display name of the resource the role is for, which is a group,
+    the directory itself for Entra roles, or an Azure resource, depending on the provider.
+    """
+
+    __slots__ = (
+        "provider",
+        "id",
+        "resource_id",
+        "group_name",
+        "role_definition_id",
+        "role",
+        "member_type",
+        "end",
+        "status",
+    )
+
+    def __init__(
+        self,
+        resource_id,
+        group_name,
+        role_definition_id,
+        role,
+        member_type="Unknown",
+        end=None,
+        status="Unknown",
+        provider="aadGroups",
+        assignment_id=None,
+    ):
+        self.provider = provider
+        self.id = assignment_id
+        self.resource_id = resource_id
+        self.group_name = group_name
+        self.role_definition_id = role_definition_id
+        self.role = role
+        self.member_type = member_type
+        self.end = end
+        self.status = status
+
+    @classmethod
+    def from_api(cls, item, provider="aadGroups"):
+        """Create from a PIM API roleAssignments item, parsing the end time once."""
+        status = item.get("status") or "Unknown"
+        if isinstance(status, dict):
+            status = status.get("status", "Unknown")
+        return cls(
+            item["resourceId"],
+            item["resource"]["displayName"],
+            item["roleDefinition"]["id"],
+            item["roleDefinition"]["displayName"],
+            item.get("memberType") or "Unknown",
+            parse_datetime(item.get("endDateTime")),
+            status,
+            provider,
+            item.get("id"),
+        )
+
+    def to_api(self):
+        """Convert back to the PIM API shape, with only the fields of an eligible assignment."""
+        return {
+            "resourceId": self.resource_id,
+            "memberType": self.member_type,
+            "resource": {"displayName": self.group_name},
+            "roleDefinition": {
+                "id": self.role_definition_id,
+                "displayName": self.role,
+            },
+        }
+
+    def __repr__(self):
+        return f"RoleAssignment({self.group_name!r}, {self.role!r})"
+
+
+class RoleAssignmentRequest:
+    """A role assignment request, holding only the fields the commands use."""
+
+    __slots__ = (
+        "provider",
+        "id",
+        "group_name",
+        "role",
+        "requested_at",
+        "status",
+        "sub_status",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        request_id,
+        group_name=None,
+        role=None,
+        requested_at=None,
+        status=None,
+        sub_status=None,
+        reason=None,
+        provider="aadGroups",
+    ):
+        self.provider = provider
+        self.id = request_id
+        self.group_name = group_name
+        self.role = role
+        self.requested_at = requested_at
+        self.status = status
+        self.sub_status = sub_status
+        self.reason = reason
+
+    @classmethod
+    def from_api(cls, item, provider="aadGroups"):
+        """Create from a PIM API roleAssignmentRequests item, parsing the request time once.
+
+        The response to creating a request may not include the expanded resource and role.
+        """
+        status = item.get("status") or {}
+        if isinstance(status, dict):
+            sub_status = status.get("subStatus")
+            status = status.get("status")
+        else:
+            status, sub_status = str(status), None
+        return cls(
+            item["id"],
+            (item.get("resource") or {}).get("displayName"),
+            (item.get("roleDefinition") or {}).get("displayName"),
+            parse_datetime(item.get("requestedDateTime")),
+            status,
+            sub_status,
+            item.get("reason"),
+            provider,
+        )
+
+    def __repr__(self):
+        return f"RoleAssignmentRequest({self.id!r}, {self.sub_status or self.status!r})"
+
+
+def parse_datetime(dt_str):
+    """Parse an ISO 8601 datetime string from the PIM API, returning None if invalid."""
+    try:
+        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
@@ -0,0 +1,219 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+# Defaults for the `pim.connect_timeout` and `pim.read_timeout` settings, in seconds
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+# Maximum number of pooled connections kept open per host
+POOL_MAXSIZE = 10
+
+# Defaults for the `pim.retry_max_attempts`, `pim.retry_backoff_base`,
+# `pim.retry_backoff_max` and `pim.deadline` settings, times in seconds
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF_BASE = 1
+DEFAULT_RETRY_BACKOFF_MAX = 30
+DEFAULT_DEADLINE = 300
+
+# Throttled and transient failures which are retried, though only those which
+# mean the request was not processed are retried for non-idempotent methods
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+UNPROCESSED_STATUS_CODES = (429, 503)
+
+_session = None
+_lock = threading.Lock()
+
+# Shared by all threads, so when the API throttles one call every call backs off
+_breaker_lock = threading.Lock()
+_breaker_open_until = 0
+
+_deadline = None
+
+
+def get_session():
+    """Get the process wide HTTP session, so connections are kept alive between calls."""
+    global _session  # pylint: disable=global-statement
+
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are not left to urllib3, errors surface straight to the caller
+            adapter = HTTPAdapter(pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(
+                {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+            )
+            _session = session
+
+    return _session
+
+
+def get_timeout(cli_ctx):
+    """Get the (connect, read) timeout for requests from the CLI config."""
+    return (
+        cli_ctx.config.getfloat(
+            "pim", "connect_timeout", fallback=DEFAULT_CONNECT_TIMEOUT
+        ),
+        cli_ctx.config.getfloat("pim", "read_timeout", fallback=DEFAULT_READ_TIMEOUT),
+    )
+
+
+def send_request(cli_ctx, method, url, timeout=None, **kwargs):
+    """Send a request with the shared session, retrying throttled and transient failures.
+
+    Retries use exponential backoff with jitter, honour Retry-After, and stop at the
+    deadline for the command. The final response is returned whatever its status. With
+    stream=True the body is left unread, and the caller must close the response.
+    """
+    from azext_pim._trace import span
+
+    with span(
+        cli_ctx, f"http {method}", method=method, url=url.split("?")[0], retries=0
+    ) as attributes:
+        response = _send_with_retries(
+            cli_ctx, method, url, timeout, attributes, **kwargs
+        )
+        attributes["status_code"] = response.status_code
+        attributes["request_bytes"] = len(response.request.body or b"")
+        if kwargs.get("stream"):
+            attributes["response_bytes"] = response.headers.get("Content-Length")
+        else:
+            attributes["response_bytes"] = len(response.content)
+        return response
+
+
+def _send_with_retries(cli_ctx, method, url, timeout, attributes, **kwargs):
+    max_attempts = cli_ctx.config.getint(
+        "pim", "retry_max_attempts", fallback=DEFAULT_RETRY_MAX_ATTEMPTS
+    )
+    backoff_base = cli_ctx.config.getfloat(
+        "pim", "retry_backoff_base", fallback=DEFAULT_RETRY_BACKOFF_BASE
+    )
+    backoff_max = cli_ctx.config.getfloat(
+        "pim", "retry_backoff_max", fallback=DEFAULT_RETRY_BACKOFF_MAX
+    )
+    deadline = _get_deadline(cli_ctx)
+    connect_timeout, read_timeout = timeout or get_timeout(cli_ctx)
+    idempotent = method.upper() == "GET"
+
+    attempt = 0
+    while True:
+        attempt += 1
+        attributes["retries"] = attempt - 1
+        _wait_for_breaker(deadline)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CLIError("Timed out waiting for the PIM API, deadline exceeded")
+
+        try:
+            response = get_session().request(
+                method,
+                url,
+                timeout=(connect_timeout, min(read_timeout, remaining)),
+                **kwargs,
+            )
+        except requests.exceptions.RequestException as e:
+            # A connect timeout means the request was never sent, so is safe to retry
+            retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+            delay = _get_backoff(attempt, backoff_base, backoff_max)
+            if not retryable or not _can_retry(attempt, max_attempts, delay, deadline):
+                raise
+            logger.debug("PIM API request failed, retrying in %.1fs: %s", delay, e)
+        else:
+            retryable = response.status_code in (
+                RETRY_STATUS_CODES if idempotent else UNPROCESSED_STATUS_CODES
+            )
+            if not retryable:
+                return response
+
+            delay = _get_retry_after(response)
+            if delay is None:
+                delay = _get_backoff(attempt, backoff_base, backoff_max)
+            if not _can_retry(attempt, max_attempts, delay, deadline):
+                return response
+            response.close()
+            logger.debug(
+                "PIM API returned %s, retrying in %.1fs", response.status_code, delay
+            )
+            if response.status_code in UNPROCESSED_STATUS_CODES:
+                # Every other call waits too, then this one waits at the breaker
+                _open_breaker(delay)
+                continue
+
+        time.sleep(delay)
+
+
+def _get_deadline(cli_ctx):
+    """Get the deadline for all PIM API calls, counted from the first call of the command."""
+    global _deadline  # pylint: disable=global-statement
+
+    with _lock:
+        if _deadline is None:
+            _deadline = time.monotonic() + cli_ctx.config.getfloat(
+                "pim", "deadline", fallback=DEFAULT_DEADLINE
+            )
+    return _deadline
+
+
+def extend_deadline(seconds):
+    """Make sure the deadline for PIM API calls is at least the given seconds from now."""
+    global _deadline  # pylint: disable=global-statement
+
+    with _lock:
+        _deadline = max(_deadline or 0, time.monotonic() + seconds)
+
+
+def _can_retry(attempt, max_attempts, delay, deadline):
+    return attempt < max_attempts and time.monotonic() + delay < deadline
+
+
+def _get_backoff(attempt, backoff_base, backoff_max):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(backoff_max, backoff_base * 2 ** (attempt - 1)))
+
+
+def _get_retry_after(response):
+    """Get the delay in seconds requested by a Retry-After header, if there is one."""
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait_for_breaker(deadline):
+    """Wait while the breaker is open, or until the deadline."""
+    with _breaker_lock:
+        open_until = _breaker_open_until
+    delay = min(open_until, deadline) - time.monotonic()
+    if delay > 0:
+        logger.debug("PIM API is throttling, waiting %.1fs", delay)
+        time.sleep(delay)
+
+
+def _open_breaker(delay):
+    """Hold back every call until the given delay has passed."""
+    global _breaker_open_until  # pylint: disable=global-statement
+
+    with _breaker_lock:
+        _breaker_open_until = max(_breaker_open_until, time.monotonic() + delay)
@@ -0,0 +1,125 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+# Characters which can continue a number, e.g. after "1", "1.", "1e" or "1e-"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks, key, members=None):
+    """Decode the items of an array in a JSON object incrementally from chunks of bytes.
+
+    Items are yielded as soon as they have been received, so only one item and one chunk
+    need to be held in memory, rather than the whole response. The other members of the
+    object, e.g. the @odata.nextLink of a page, are added to the members dict if given.
+    """
+    reader = _Reader(chunks)
+    members = {} if members is None else members
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.next()
+        return
+    while True:
+        name = reader.decode_value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.next()
+            if reader.peek() == "]":
+                reader.next()
+            else:
+                while True:
+                    yield reader.decode_value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            members[name] = reader.decode_value()
+        if reader.expect(",}") == "}":
+            return
+
+
+class _Reader:
+    """Buffer over decoded text chunks, refilled on demand as values are read."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def peek(self):
+        """Get the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON response")
+
+    def next(self):
+        char = self.peek()
+        self._pos += 1
+        return char
+
+    def expect(self, chars):
+        char = self.next()
+        if char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON response, found {char!r}"
+            )
+        return char
+
+    def decode_value(self):
+        """Decode the next complete JSON value, reading more chunks until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number may be cut short by the end of the buffer, so needs a delimiter
+            # after it rather than only more number characters, which the next chunk
+            # may continue. A cut at "1." or "1e" decodes as 1, with the rest left over
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            cut = end == len(self._buffer) or (
+                is_number and self._only_number_chars(end)
+            )
+            if cut and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _only_number_chars(self, pos):
+        """Whether only number characters follow a position, to the end of the buffer."""
+        while pos < len(self._buffer):
+            if self._buffer[pos] not in _NUMBER_CHARS:
+                return False
+            pos += 1
+        return True
+
+    def _fill(self):
+        """Read the next chunk, dropping the consumed part of the buffer. False at the end."""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
@@ -0,0 +1,120 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+# Default for the `pim.tenant_timeout` setting, in seconds for each tenant queried
+DEFAULT_TENANT_TIMEOUT = 60
+
+
+def get_tenants(cli_ctx, tenants=None, all_tenants=False):
+    """Get the tenants to query, or None for only the current tenant.
+
+    All tenants means every tenant with a subscription, or logged in with
+    --allow-no-subscriptions, for the current account.
+    """
+    if tenants:
+        return list(OrderedDict.fromkeys(tenants))
+    if not all_tenants:
+        return None
+
+    from azure.cli.core._profile import Profile
+
+    profile = Profile(cli_ctx=cli_ctx)
+    user = profile.get_subscription()["user"]["name"]
+    return list(
+        OrderedDict.fromkeys(
+            subscription["tenantId"]
+            for subscription in profile.load_cached_subscriptions()
+            if subscription["user"]["name"] == user
+        )
+    )
+
+
+def query_tenants(cli_ctx, tenants, query, providers=None):
+    """Run a query with a client for each tenant and provider concurrently, merging the rows.
+
+    Tenants of None means the current tenant, and providers are --provider names, or None
+    for groups. Each row gains a tenant and a provider column, for those which were given.
+    A tenant or provider which fails, or does not finish within the `pim.tenant_timeout`
+    setting, is reported without holding up the rest. The query runs in daemon threads, so
+    one still stuck at the timeout does not delay exit.
+    """
+    from azext_pim._client_factory import cf_pim
+    from azext_pim.pim import PROVIDERS
+
+    timeout = cli_ctx.config.getfloat(
+        "pim", "tenant_timeout", fallback=DEFAULT_TENANT_TIMEOUT
+    )
+    targets = [
+        (tenant, provider)
+        for tenant in tenants or [None]
+        for provider in providers or [None]
+    ]
+    results = {}
+
+    def run(target):
+        tenant, provider = target
+        try:
+            client = cf_pim(cli_ctx, tenant=tenant, provider=PROVIDERS.get(provider))
+            # Sign in here, as the query may run in worker threads which would delay exit
+            client.user_id  # pylint: disable=pointless-statement
+            results[target] = (query(client), None)
+        except Exception as e:  # pylint: disable=broad-except
+            results[target] = (None, e)
+
+    threads = [
+        threading.Thread(
+            target=run, args=(target,), name=f"pim-query-{index}", daemon=True
+        )
+        for index, target in enumerate(targets)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+
+    rows = []
+    errors = []
+    for tenant, provider in targets:
+        target_rows, error = results.get((tenant, provider), (None, None))
+        if target_rows is None:
+            errors.append(
+                (
+                    _describe_target(tenant, provider),
+                    error or f"timed out after {timeout:g}s",
+                )
+            )
+            continue
+        columns = ([("tenant", tenant)] if tenants else []) + (
+            [("provider", provider)] if providers else []
+        )
+        rows.extend(OrderedDict(columns + list(row.items())) for row in target_rows)
+
+    if len(errors) == len(targets):
+        if len(errors) == 1 and isinstance(errors[0][1], CLIError):
+            raise errors[0][1]
+        raise CLIError(
+            "Failed to query any tenant or provider: "
+            + "; ".join(f"{target}: {error}" for target, error in errors)
+        )
+    for target, error in errors:
+        logger.error("Failed to query %s: %s", target, error)
+    return rows
+
+
+def _describe_target(tenant, provider):
+    if tenant and provider:
+        return f"{provider} in tenant {tenant}"
+    if tenant:
+        return f"tenant {tenant}"
+    return provider or "the current tenant"
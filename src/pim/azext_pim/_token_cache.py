@@ -0,0 +1,132 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import threading
+import time
+from datetime import datetime
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# Tokens are refreshed this many seconds before they actually expire
+TOKEN_REFRESH_MARGIN = 300
+
+TOKEN_CACHE_FILE = "token_cache"
+
+# Process wide cache of tokens, keyed by resource and tenant, with a lock for each key
+# so tokens for different tenants are acquired concurrently
+_tokens = {}
+_locks = {}
+_lock = threading.Lock()
+_persistence_lock = threading.Lock()
+
+
+def get_token(cli_ctx, resource, tenant=None):
+    """Get an access token for a resource, only acquiring a new one when close to expiry.
+
+    The token is for the current account's tenant, or another tenant of the same account.
+    """
+    with _lock:
+        token_lock = _locks.setdefault((resource, tenant), threading.Lock())
+
+    with token_lock:
+        entry = _tokens.get((resource, tenant))
+        if _is_fresh(entry):
+            return entry["token"]
+
+        persistence = _get_persistence(cli_ctx)
+        if persistence:
+            key = f"{account_key(cli_ctx, tenant)}/{resource}"
+            with _persistence_lock:
+                entry = _load_entries(persistence).get(key)
+            if _is_fresh(entry):
+                logger.debug("Using PIM token from on-disk cache")
+                _tokens[(resource, tenant)] = entry
+                return entry["token"]
+
+        from azure.cli.core._profile import Profile
+        from azext_pim._trace import span
+
+        with span(cli_ctx, "token acquire", resource=resource, tenant=tenant):
+            profile = Profile(cli_ctx=cli_ctx)
+            token_info, _, _ = profile.get_raw_token(resource=resource, tenant=tenant)
+        entry = {"token": token_info[1], "expires_on": _get_expiry(token_info[2])}
+        _tokens[(resource, tenant)] = entry
+
+        if persistence:
+            with _persistence_lock:
+                # Drop anything expired while we are rewriting the file
+                entries = {
+                    k: v for k, v in _load_entries(persistence).items() if _is_fresh(v)
+                }
+                entries[key] = entry
+                _save_entries(persistence, entries)
+
+        return entry["token"]
+
+
+def clear_tokens():
+    """Forget the tokens held in memory, e.g. when the signed in account changes."""
+    with _lock:
+        _tokens.clear()
+
+
+def account_key(cli_ctx, tenant=None):
+    """Get a key identifying the tenant and current account, without acquiring a token."""
+    from azure.cli.core._profile import Profile
+
+    account = Profile(cli_ctx=cli_ctx).get_subscription()
+    return f"{tenant or account['tenantId']}/{account['user']['name']}"
+
+
+def _is_fresh(entry):
+    return bool(entry) and entry["expires_on"] - TOKEN_REFRESH_MARGIN > time.time()
+
+
+def _get_expiry(token_entry):
+    """Get the expiry of a raw token entry as a POSIX timestamp."""
+    if token_entry.get("expires_on"):
+        return int(token_entry["expires_on"])
+    try:
+        # Older versions of the CLI only provide a local datetime string
+        expires_on = datetime.strptime(token_entry["expiresOn"], "%Y-%m-%d %H:%M:%S.%f")
+        return int(expires_on.timestamp())
+    except (KeyError, TypeError, ValueError):
+        # Unknown expiry, so never treat the token as fresh
+        return 0
+
+
+def _get_persistence(cli_ctx):
+    """Get the on-disk token persistence, if enabled with `pim.token_cache_persist`."""
+    if not cli_ctx.config.getboolean("pim", "token_cache_persist", fallback=False):
+        return None
+
+    from azure.cli.core.auth.persistence import build_persistence
+    from azure.cli.core.util import should_encrypt_token_cache
+    from azext_pim._cache import cache_path
+
+    try:
+        return build_persistence(
+            cache_path(cli_ctx, TOKEN_CACHE_FILE),
+            should_encrypt_token_cache(cli_ctx),
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("On-disk token cache unavailable: %s", e)
+        return None
+
+
+def _load_entries(persistence):
+    try:
+        return json.loads(persistence.load())
+    except Exception:  # pylint: disable=broad-except
+        return {}
+
+
+def _save_entries(persistence, entries):
+    try:
+        persistence.save(json.dumps(entries))
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("Failed to save on-disk token cache: %s", e)
@@ -0,0 +1,170 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# Spans are written to this file when set, or the `pim.trace_file` setting
+TRACE_FILE_ENV_VAR = "AZURE_PIM_TRACE_FILE"
+
+# Formats for the `pim.trace_format` setting
+TRACE_FORMAT_JSONL = "jsonl"
+TRACE_FORMAT_OTLP = "otlp"
+
+_spans = []
+_lock = threading.Lock()
+_trace_file = None
+_trace_format = TRACE_FORMAT_JSONL
+_enabled = None
+
+
+@contextmanager
+def span(cli_ctx, name, **attributes):
+    """Record the timing of an operation, when tracing or debug logging is enabled.
+
+    Yields a dict of attributes which the caller can add to while the span is open.
+    """
+    if not _is_enabled(cli_ctx):
+        yield attributes
+        return
+
+    start_time = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        record = {
+            "name": name,
+            "start": start_time,
+            "duration": time.perf_counter() - start,
+            "thread": threading.current_thread().name,
+            "attributes": attributes,
+        }
+        if error:
+            record["error"] = error
+        with _lock:
+            _spans.append(record)
+
+
+def _is_enabled(cli_ctx):
+    global _enabled, _trace_file, _trace_format  # pylint: disable=global-statement
+
+    with _lock:
+        if _enabled is None:
+            _trace_file = os.environ.get(TRACE_FILE_ENV_VAR) or cli_ctx.config.get(
+                "pim", "trace_file", fallback=None
+            )
+            _trace_format = cli_ctx.config.get(
+                "pim", "trace_format", fallback=TRACE_FORMAT_JSONL
+            ).lower()
+            _enabled = bool(_trace_file) or logger.isEnabledFor(logging.DEBUG)
+            if _enabled:
+                atexit.register(_export)
+    return _enabled
+
+
+def _export():
+    """Write the recorded spans to the trace file, and a summary to the debug log."""
+    with _lock:
+        spans = list(_spans)
+    if not spans:
+        return
+
+    _log_summary(spans)
+
+    if not _trace_file:
+        return
+    try:
+        with open(_trace_file, "a", encoding="utf-8") as f:
+            if _trace_format == TRACE_FORMAT_OTLP:
+                f.write(json.dumps(_to_otlp(spans)) + "\n")
+            else:
+                for record in spans:
+                    f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        logger.warning("Unable to write PIM trace file %s: %s", _trace_file, e)
+
+
+def _log_summary(spans):
+    totals = {}
+    for record in spans:
+        count, total, longest = totals.get(record["name"], (0, 0, 0))
+        totals[record["name"]] = (
+            count + 1,
+            total + record["duration"],
+            max(longest, record["duration"]),
+        )
+
+    lines = [f"{'Span':<32} {'Count':>5} {'Total ms':>10} {'Max ms':>10}"]
+    for name, (count, total, longest) in sorted(
+        totals.items(), key=lambda item: item[1][1], reverse=True
+    ):
+        lines.append(
+            f"{name:<32} {count:>5} {total * 1000:>10.1f} {longest * 1000:>10.1f}"
+        )
+    logger.debug("PIM trace summary:\n%s", "\n".join(lines))
+
+
+def _to_otlp(spans):
+    """Convert spans to an OpenTelemetry OTLP/JSON trace export request."""
+    trace_id = os.urandom(16).hex()
+    otlp_spans = []
+    for record in spans:
+        start_ns = int(record["start"] * 1e9)
+        attributes = dict(record["attributes"], thread=record["thread"])
+        otlp_span = {
+            "traceId": trace_id,
+            "spanId": os.urandom(8).hex(),
+            "name": record["name"],
+            "kind": 3 if record["name"].startswith("http") else 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(record["duration"] * 1e9)),
+            "attributes": [
+                {"key": key, "value": _to_otlp_value(value)}
+                for key, value in attributes.items()
+                if value is not None
+            ],
+            "status": (
+                {"code": 2, "message": record["error"]}
+                if "error" in record
+                else {"code": 1}
+            ),
+        }
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": "azext_pim"}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "azext_pim"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def _to_otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
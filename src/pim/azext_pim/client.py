@@ -0,0 +1,236 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import asyncio
+import threading
+import time
+from knack.util import CLIError
+from azext_pim import pim
+
+# Sub statuses which end the wait for an activation request, compared ignoring case
+REQUEST_SUCCEEDED_STATUSES = ("Provisioned", "ScheduleCreated")
+REQUEST_FAILED_STATUSES = (
+    "Denied",
+    "AdminDenied",
+    "Canceled",
+    "Failed",
+    "FailedAsResourceIsLocked",
+    "Revoked",
+    "TimedOut",
+    "Invalid",
+)
+
+# Polling intervals in seconds when waiting for a request, starting fast then backing off
+WAIT_INITIAL_INTERVAL = 2
+WAIT_MAX_INTERVAL = 30
+WAIT_BACKOFF_FACTOR = 1.5
+
+
+class PimClient:
+    """Client for PIM operations for the signed in user, with one PIM provider.
+
+    The HTTP session and access tokens are shared by the whole process, and the user ID
+    is resolved once per client, so a long running process should keep one client and
+    reuse it. Methods are thread safe, and each has an asyncio equivalent which runs it
+    in a worker thread. The `pim.deadline` setting applies to each method call.
+
+    Assignments and requests are returned as compact RoleAssignment and
+    RoleAssignmentRequest records, with their times already parsed to datetimes. A client
+    is for the tenant of the current account, or another tenant the account can sign in to.
+    The provider is one of the pim.PROVIDERS values, for groups by default, and requests
+    to activate or poll a record go to the provider the record came from.
+    """
+
+    def __init__(self, cli_ctx, tenant=None, provider=pim.DEFAULT_PROVIDER):
+        self.cli_ctx = cli_ctx
+        self.tenant = tenant
+        self.provider = provider
+        self._user_id = None
+        self._lock = threading.Lock()
+
+    @property
+    def user_id(self):
+        """The object ID of the signed in user."""
+        with self._lock:
+            if self._user_id is None:
+                self._user_id = pim.get_user_id(self.cli_ctx, self.tenant)
+        return self._user_id
+
+    def list_eligible(self, refresh=False, group_name=None):
+        """List eligible role assignments, from the local cache when possible."""
+        self._start_operation()
+        return pim.get_eligible_assignments(
+            self.cli_ctx, self.user_id, refresh, group_name, self.tenant, self.provider
+        )
+
+    def iter_eligible(self, position=None, select=None):
+        """Iterate over eligible role assignments from the PIM API, a page at a time.
+
+        A position dict is kept updated with the page being read, to resume from later.
+        The fields selected can be widened from those the commands use.
+        """
+        self._start_operation()
+        return pim.iter_role_assignments(
+            self.cli_ctx,
+            self.user_id,
+            "Eligible",
+            tenant=self.tenant,
+            provider=self.provider,
+            position=position,
+            select=select,
+        )
+
+    def iter_active(self, position=None, validator=None, select=None):
+        """Iterate over active role assignments, a page at a time.
+
+        A validator dict makes the query conditional, see pim.iter_pages.
+        """
+        self._start_operation()
+        return pim.iter_role_assignments(
+            self.cli_ctx,
+            self.user_id,
+            "Active",
+            tenant=self.tenant,
+            provider=self.provider,
+            position=position,
+            validator=validator,
+            select=select,
+        )
+
+    def list_active(self):
+        """List active role assignments."""
+        return list(self.iter_active())
+
+    def iter_pending(
+        self, status="PendingApproval", position=None, since=None, validator=None
+    ):
+        """Iterate over role assignment requests with a sub status, or any, a page at a time.
+
+        Only requests made at or after the since datetime are returned, when one is given.
+        A validator dict makes the query conditional, see pim.iter_pages.
+        """
+        self._start_operation()
+        return pim.iter_role_assignment_requests(
+            self.cli_ctx,
+            self.user_id,
+            status,
+            tenant=self.tenant,
+            provider=self.provider,
+            position=position,
+            since=since,
+            validator=validator,
+        )
+
+    def list_pending(self, status="PendingApproval"):
+        """List role assignment requests with a sub status."""
+        return list(self.iter_pending(status))
+
+    def request(self, assignment, reason, duration_hours, request_type="UserAdd"):
+        """Request activation of an eligible role assignment, returning the new request.
+
+        Use a request type of UserExtend to extend an assignment which is already active.
+        """
+        self._start_operation()
+        return pim.create_role_assignment_request(
+            self.cli_ctx,
+            assignment.role_definition_id,
+            assignment.resource_id,
+            self.user_id,
+            reason,
+            duration_hours,
+            request_type,
+            self.tenant,
+            assignment.provider,
+        )
+
+    def get_request(self, request_id):
+        """Get a role assignment request by ID."""
+        self._start_operation()
+        return pim.get_role_assignment_request(
+            self.cli_ctx, request_id, self.tenant, self.provider
+        )
+
+    def get_latest_request(self, group_name, role):
+        """Get the most recent role assignment request for a group and role, if any."""
+        self._start_operation()
+        return pim.get_latest_role_assignment_request(
+            self.cli_ctx, self.user_id, group_name, role, self.tenant, self.provider
+        )
+
+    def wait(self, request, timeout):
+        """Poll a role assignment request until it succeeds, fails or the timeout is reached."""
+        from azext_pim._session import extend_deadline
+
+        extend_deadline(timeout + WAIT_MAX_INTERVAL)
+        deadline = time.monotonic() + timeout
+        interval = WAIT_INITIAL_INTERVAL
+
+        while True:
+            sub_status = get_sub_status(request)
+            if has_succeeded(request):
+                return request
+            if has_failed(request):
+                raise CLIError(f"Activation request was not completed: {sub_status}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CLIError(
+                    f"Timed out after {timeout}s waiting for activation request, status: {sub_status}"
+                )
+
+            time.sleep(min(interval, remaining))
+            interval = min(interval * WAIT_BACKOFF_FACTOR, WAIT_MAX_INTERVAL)
+            request = pim.get_role_assignment_request(
+                self.cli_ctx, request.id, self.tenant, request.provider
+            )
+
+    async def list_eligible_async(self, refresh=False, group_name=None):
+        return await asyncio.to_thread(self.list_eligible, refresh, group_name)
+
+    async def list_active_async(self):
+        return await asyncio.to_thread(self.list_active)
+
+    async def list_pending_async(self, status="PendingApproval"):
+        return await asyncio.to_thread(self.list_pending, status)
+
+    async def request_async(
+        self, assignment, reason, duration_hours, request_type="UserAdd"
+    ):
+        return await asyncio.to_thread(
+            self.request, assignment, reason, duration_hours, request_type
+        )
+
+    async def get_request_async(self, request_id):
+        return await asyncio.to_thread(self.get_request, request_id)
+
+    async def wait_async(self, request, timeout):
+        return await asyncio.to_thread(self.wait, request, timeout)
+
+    def _start_operation(self):
+        from azext_pim._session import DEFAULT_DEADLINE, extend_deadline
+
+        extend_deadline(
+            self.cli_ctx.config.getfloat("pim", "deadline", fallback=DEFAULT_DEADLINE)
+        )
+
+
+def get_sub_status(request):
+    """Get the sub status of a role assignment request, e.g. PendingApproval."""
+    return request.sub_status or request.status or "Unknown"
+
+
+def has_succeeded(request):
+    """Whether a role assignment request has been provisioned."""
+    return _has_sub_status(request, REQUEST_SUCCEEDED_STATUSES)
+
+
+def has_failed(request):
+    """Whether a role assignment request has ended without being provisioned."""
+    return _has_sub_status(request, REQUEST_FAILED_STATUSES)
+
+
+def _has_sub_status(request, statuses):
+    sub_status = get_sub_status(request).lower()
+    return any(sub_status == status.lower() for status in statuses)
@@ -5,31 +5,92 @@
 
 
 def load_command_table(self, _):
+    from azext_pim._format import (
+        tenant_table,
+        transform_history_output,
+        transform_request_output,
+    )
+
     with self.command_group("pim") as g:
         g.custom_command(
             "list",
             "list_pim",
-            table_transformer="[].{GroupName:groupName, Roles:roles}",
+            table_transformer=tenant_table(
+                [("GroupName", "groupName"), ("Roles", "roles")]
+            ),
         )
         g.custom_command(
             "active",
             "active_pim",
-            table_transformer="[].{GroupName:groupName, Role:role, MemberType:memberType, Expires:expires, TimeRemaining:timeRemaining, Status:status}",
+            table_transformer=tenant_table(
+                [
+                    ("GroupName", "groupName"),
+                    ("Role", "role"),
+                    ("MemberType", "memberType"),
+                    ("Expires", "expires"),
+                    ("TimeRemaining", "timeRemaining"),
+                    ("Status", "status"),
+                ]
+            ),
         )
         g.custom_command(
             "pending",
             "pending_pim",
-            table_transformer="[].{GroupName:groupName, Role:role, RequestedAt:requestedAt, Status:status}",
+            table_transformer=tenant_table(
+                [
+                    ("GroupName", "groupName"),
+                    ("Role", "role"),
+                    ("RequestedAt", "requestedAt"),
+                    ("Status", "status"),
+                ]
+            ),
         )
         g.custom_command(
             "status",
             "status_pim",
-            table_transformer="[].{GroupName:groupName, Role:role, Type:type, Expires:expires, TimeRemaining:timeRemaining, RequestedAt:requestedAt, Status:status}",
+            table_transformer=tenant_table(
+                [
+                    ("GroupName", "groupName"),
+                    ("Role", "role"),
+                    ("Type", "type"),
+                    ("Expires", "expires"),
+                    ("TimeRemaining", "timeRemaining"),
+                    ("RequestedAt", "requestedAt"),
+                    ("Status", "status"),
+                ]
+            ),
         )
         g.custom_command(
             "request",
             "request_pim",
-            table_transformer="{GroupName:groupName, Role:role, Status:status, Reason:reason, Duration:duration}",
+            table_transformer=transform_request_output,
+        )
+        g.custom_command(
+            "wait",
+            "wait_pim",
+            table_transformer="{GroupName:groupName, Role:role, Status:status, RequestedAt:requestedAt, Waited:waited}",
+        )
+        g.custom_command(
+            "keepalive",
+            "keepalive_pim",
+            table_transformer="[].{GroupName:groupName, Role:role, Renewals:renewals, Expires:expires, Status:status}",
+        )
+        g.custom_command("prompt", "prompt_pim")
+        g.custom_command("export", "export_pim")
+        g.custom_command(
+            "history",
+            "history_pim",
+            table_transformer=transform_history_output,
+        )
+        g.custom_command(
+            "diag",
+            "diag_pim",
+            table_transformer="[].{Phase:phase, Ms:ms, Percent:percent, Calls:calls}",
+        )
+        g.custom_command(
+            "broker",
+            "broker_pim",
+            table_transformer="{Requests:requests, Coalesced:coalesced, ApiCalls:apiCalls}",
         )
 
     with self.command_group("pim", is_preview=True):
@@ -3,34 +3,44 @@
 # Licensed under the MIT License. See LICENSE in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import time
 from collections import OrderedDict
 from knack.util import CLIError
 from azext_pim import pim
+from azext_pim._client_factory import cf_pim
 
 
-def list_pim(cmd):
+def list_pim(cmd, refresh=False, tenant=None, all_tenants=False, provider=None):
     """List all eligible PIM groups for the current user."""
-    user_id = pim.get_user_id(cmd.cli_ctx)
-    assignments = pim.get_role_assignments(cmd.cli_ctx, user_id, "Eligible")
+    results = _query(
+        cmd,
+        tenant,
+        all_tenants,
+        lambda client: _get_eligible_groups(client, refresh),
+        provider,
+    )
 
-    if not assignments:
+    if not results:
         from knack.log import get_logger
 
         logger = get_logger(__name__)
         logger.warning("No eligible PIM groups found")
-        return []
 
+    return results
+
+
+def _get_eligible_groups(client, refresh):
     # Group by resource name
     groups = {}
-    for assignment in assignments:
-        group_name = assignment["resource"]["displayName"]
+    for assignment in client.list_eligible(refresh):
+        group_name = assignment.group_name
         if group_name not in groups:
             groups[group_name] = {"groupName": group_name, "roles": []}
         groups[group_name]["roles"].append(
             OrderedDict(
                 [
-                    ("role", assignment["roleDefinition"]["displayName"]),
-                    ("memberType", assignment.get("memberType", "Unknown")),
+                    ("role", assignment.role),
+                    ("memberType", assignment.member_type),
                 ]
             )
         )
@@ -38,83 +48,132 @@ def list_pim(cmd):
     return list(groups.values())
 
 
-def active_pim(cmd):
+def active_pim(cmd, tenant=None, all_tenants=False, provider=None, since_last=False):
     """List all active PIM group activations for the current user."""
-    user_id = pim.get_user_id(cmd.cli_ctx)
-    assignments = pim.get_role_assignments(cmd.cli_ctx, user_id, "Active")
+    query = _get_active_changes if since_last else _get_active
+    results = _query(cmd, tenant, all_tenants, query, provider)
 
-    if not assignments:
+    if not results:
         from knack.log import get_logger
 
         logger = get_logger(__name__)
-        logger.warning("No active groups found")
-        return []
+        if since_last:
+            logger.warning("No changes to active groups since the last run")
+        else:
+            logger.warning("No active groups found")
 
-    results = []
-    for assignment in assignments:
-        end_datetime = assignment.get("endDateTime")
-        status = assignment.get("status", "Unknown")
-        if isinstance(status, dict):
-            status = status.get("status", "Unknown")
+    return results
 
-        results.append(
-            OrderedDict(
-                [
-                    ("groupName", assignment["resource"]["displayName"]),
-                    ("role", assignment["roleDefinition"]["displayName"]),
-                    ("memberType", assignment.get("memberType", "Unknown")),
-                    ("expires", pim.format_datetime(end_datetime)),
-                    ("timeRemaining", pim.calculate_time_remaining(end_datetime)),
-                    ("status", status),
-                ]
-            )
-        )
 
-    return results
+def _get_active(client):
+    return [_active_row(assignment) for assignment in client.iter_active()]
 
 
-def pending_pim(cmd):
-    """List all pending PIM group activation requests for the current user."""
-    user_id = pim.get_user_id(cmd.cli_ctx)
-    assignments = pim.get_role_assignment_requests(
-        cmd.cli_ctx, user_id, "PendingApproval"
+def _get_active_changes(client):
+    from azext_pim._delta import get_changes
+
+    # Only the changed rows are formatted
+    return [
+        OrderedDict([("change", change)] + list(_active_row(assignment).items()))
+        for change, assignment in get_changes(client.cli_ctx, client, "active")
+    ]
+
+
+def _active_row(assignment):
+    return OrderedDict(
+        [
+            ("groupName", assignment.group_name),
+            ("role", assignment.role),
+            ("memberType", assignment.member_type),
+            ("expires", pim.format_datetime(assignment.end)),
+            ("timeRemaining", pim.calculate_time_remaining(assignment.end)),
+            ("status", assignment.status),
+        ]
     )
 
-    if not assignments:
+
+def pending_pim(cmd, tenant=None, all_tenants=False, provider=None, since_last=False):
+    """List all pending PIM group activation requests for the current user."""
+    query = _get_pending_changes if since_last else _get_pending
+    results = _query(cmd, tenant, all_tenants, query, provider)
+
+    if not results:
         from knack.log import get_logger
 
         logger = get_logger(__name__)
-        logger.warning("No pending requests found")
-        return []
-
-    results = []
-    for assignment in assignments:
-        status_info = assignment.get("status", {})
-        if isinstance(status_info, dict):
-            status = f"{status_info.get('status', '')} {status_info.get('subStatus', '')}".strip()
+        if since_last:
+            logger.warning("No changes to pending requests since the last run")
         else:
-            status = str(status_info)
+            logger.warning("No pending requests found")
 
-        requested_at = assignment.get("requestedDateTime")
+    return results
 
-        results.append(
-            OrderedDict(
-                [
-                    ("groupName", assignment["resource"]["displayName"]),
-                    ("role", assignment["roleDefinition"]["displayName"]),
-                    ("requestedAt", pim.format_datetime(requested_at)),
-                    ("status", status),
-                ]
-            )
-        )
 
-    return results
+def _get_pending(client):
+    return [_pending_row(request) for request in client.iter_pending()]
+
+
+def _get_pending_changes(client):
+    from azext_pim._delta import get_changes
+
+    return [
+        OrderedDict([("change", change)] + list(_pending_row(request).items()))
+        for change, request in get_changes(client.cli_ctx, client, "pending")
+    ]
+
+
+def _pending_row(request):
+    status = f"{request.status or ''} {request.sub_status or ''}".strip()
+    return OrderedDict(
+        [
+            ("groupName", request.group_name),
+            ("role", request.role),
+            ("requestedAt", pim.format_datetime(request.requested_at)),
+            ("status", status),
+        ]
+    )
 
 
-def status_pim(cmd):
+def status_pim(cmd, tenant=None, all_tenants=False, provider=None):
     """List both active and pending PIM group activations for the current user."""
-    active_groups = active_pim(cmd)
-    pending_requests = pending_pim(cmd)
+    return _query(cmd, tenant, all_tenants, _get_status, provider)
+
+
+def _get_status(client):
+    import threading
+    from knack.log import get_logger
+
+    logger = get_logger(__name__)
+
+    # The client resolves identity (and so the token) once for both concurrent fetches.
+    # Pending requests are fetched in a daemon thread rather than an executor, as Python
+    # waits for executor workers at exit, so a tenant stuck here would hold up exit
+    pending = {}
+
+    def fetch_pending():
+        try:
+            pending["result"] = _call_result(_get_pending, client)
+        except BaseException as e:  # pylint: disable=broad-except
+            pending["result"] = e
+
+    thread = threading.Thread(
+        target=fetch_pending, name="pim-status-pending", daemon=True
+    )
+    thread.start()
+    # Report a failure in one view without dropping the other
+    active_groups, active_error = _call_result(_get_active, client)
+    thread.join()
+    if isinstance(pending["result"], BaseException):
+        raise pending["result"]
+    pending_requests, pending_error = pending["result"]
+    if active_error and pending_error:
+        raise active_error
+    where = f" for {client.provider}" if client.provider != pim.DEFAULT_PROVIDER else ""
+    where += f" in tenant {client.tenant}" if client.tenant else ""
+    if active_error:
+        logger.error("Failed to get active groups%s: %s", where, active_error)
+    if pending_error:
+        logger.error("Failed to get pending requests%s: %s", where, pending_error)
 
     # Flatten the output for better table display
     results = []
@@ -149,58 +208,165 @@ def status_pim(cmd):
     return results
 
 
-def request_pim(cmd, name, reason, duration=12, role="Member"):
-    """Request activation for a PIM group with the specified role."""
-    user_id = pim.get_user_id(cmd.cli_ctx)
+def _query(cmd, tenant, all_tenants, query, provider=None):
+    """Run a query with a client for the current tenant and groups, or concurrently for several."""
+    from azext_pim._tenants import get_tenants, query_tenants
+
+    tenants = get_tenants(cmd.cli_ctx, tenant, all_tenants)
+    providers = list(OrderedDict.fromkeys(provider)) if provider else None
+    if tenants is None and providers is None:
+        return query(cf_pim(cmd.cli_ctx))
+    if tenants is not None and not tenants:
+        raise CLIError("No tenants found for the current account")
+    return query_tenants(cmd.cli_ctx, tenants, query, providers)
+
+
+def _call_result(function, *args):
+    """Call a function, returning a (result, error) tuple and capturing CLI errors."""
+    try:
+        return function(*args), None
+    except CLIError as e:
+        return [], e
+
+
+def request_pim(
+    cmd,
+    name,
+    reason,
+    duration=12,
+    role="Member",
+    max_parallel=4,
+    refresh=False,
+    wait=False,
+    wait_timeout=3600,
+    provider=None,
+):
+    """Request activation for one or more PIM groups with the specified role."""
+    providers = [pim.PROVIDERS[p] for p in OrderedDict.fromkeys(provider or ["groups"])]
+    # Each activation is routed to the provider its eligible assignment came from
+    clients = [cf_pim(cmd.cli_ctx, provider=p) for p in providers]
+    client = clients[0]
 
     # Validate inputs
-    if not name:
+    names = _parse_group_names(name)
+    if not names:
         raise CLIError("Group name must be specified")
     if not reason:
         raise CLIError("Reason must be specified")
     if duration <= 0:
         raise CLIError("Duration must be greater than zero")
-
-    # Find the eligible role assignment for the specified group
-    assignments = pim.get_role_assignments(cmd.cli_ctx, user_id, "Eligible")
-
-    target_assignment = None
-    for assignment in assignments:
+    if max_parallel < 1:
+        raise CLIError("Max parallel must be at least one")
+    if wait and wait_timeout <= 0:
+        raise CLIError("Wait timeout must be greater than zero")
+    wait_timeout = wait_timeout if wait else None
+
+    # A single exact group name keeps the simple single result behaviour
+    if len(names) == 1 and not _is_group_pattern(names[0]):
+        eligible = _get_eligible_index(clients, refresh, names[0])
+        target_assignment = eligible.get((names[0], role.lower()))
         if (
-            assignment["resource"]["displayName"] == name
-            and assignment["roleDefinition"]["displayName"].lower() == role.lower()
+            not target_assignment
+            and not refresh
+            and pim.get_eligibility_cache_ttl(cmd.cli_ctx) > 0
         ):
-            target_assignment = assignment
-            break
+            # The group may be newly eligible since the cache was filled
+            eligible = _get_eligible_index(clients, True, names[0])
+            target_assignment = eligible.get((names[0], role.lower()))
+        if not target_assignment:
+            raise CLIError(f"No eligible group found: {names[0]} with role: {role}")
+
+        try:
+            return _request_activation(
+                client,
+                names[0],
+                target_assignment,
+                reason,
+                duration,
+                role,
+                wait_timeout,
+            )
+        except CLIError:
+            _invalidate_eligibility(cmd.cli_ctx, [target_assignment.provider])
+            raise
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    eligible = _get_eligible_index(clients, refresh)
+    targets = _match_group_names(names, eligible, role)
+    if not targets:
+        raise CLIError(f"No eligible groups found matching: {', '.join(names)}")
+
+    def request_target(target):
+        group_name, target_assignment = target
+        if not target_assignment:
+            return _request_result(
+                group_name, role, "Failed", reason, duration, "No eligible group found"
+            )
+        try:
+            result = _request_activation(
+                client,
+                group_name,
+                target_assignment,
+                reason,
+                duration,
+                role,
+                wait_timeout,
+            )
+            result["error"] = None
+            return result
+        except CLIError as e:
+            return _request_result(group_name, role, "Failed", reason, duration, str(e))
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        results = list(executor.map(request_target, targets))
+
+    if any(result["error"] for result in results):
+        _invalidate_eligibility(cmd.cli_ctx, providers)
+
+    return results
 
-    if not target_assignment:
-        raise CLIError(f"No eligible group found: {name} with role: {role}")
 
+def _get_eligible_index(clients, refresh, group_name=None):
+    """Index the eligible role assignments of each provider by name and lower case role.
+
+    The providers are fetched concurrently, and the first listed wins for a name in several.
+    """
+    if len(clients) == 1:
+        assignment_lists = [clients[0].list_eligible(refresh, group_name)]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            assignment_lists = list(
+                executor.map(
+                    lambda client: client.list_eligible(refresh, group_name), clients
+                )
+            )
+
+    eligible = {}
+    for assignments in assignment_lists:
+        for assignment in assignments:
+            eligible.setdefault(
+                (assignment.group_name, assignment.role.lower()), assignment
+            )
+    return eligible
+
+
+def _request_activation(
+    client, name, target_assignment, reason, duration, role, wait_timeout=None
+):
+    """Submit an activation request for an eligible assignment, optionally waiting for it."""
     try:
-        response = pim.create_role_assignment_request(
-            cmd.cli_ctx,
-            target_assignment["roleDefinition"]["id"],
-            target_assignment["resourceId"],
-            user_id,
-            reason,
-            duration,
-        )
+        response = client.request(target_assignment, reason, duration)
+        if wait_timeout:
+            response = client.wait(response, wait_timeout)
 
-        status_info = response.get("status", {})
-        if isinstance(status_info, dict):
-            status = status_info.get("status", "Unknown")
-        else:
-            status = str(status_info)
+        status = response.status or "Unknown"
+        if wait_timeout:
+            status = response.sub_status or status
 
-        return OrderedDict(
-            [
-                ("groupName", name),
-                ("role", role),
-                ("status", status),
-                ("reason", reason),
-                ("duration", f"{duration} hours"),
-            ]
-        )
+        return _request_result(name, role, status, reason, duration)
     except CLIError as e:
         # Check if it's already active (HTTP 400 typically means already active)
         if "already" in str(e).lower() or "active" in str(e).lower():
@@ -208,13 +374,356 @@ def request_pim(cmd, name, reason, duration=12, role="Member"):
 
             logger = get_logger(__name__)
             logger.warning(str(e))
-            return OrderedDict(
-                [
-                    ("groupName", name),
-                    ("role", role),
-                    ("status", str(e)),
-                    ("reason", reason),
-                    ("duration", f"{duration} hours"),
-                ]
-            )
+            return _request_result(name, role, str(e), reason, duration)
         raise
+
+
+def _invalidate_eligibility(cli_ctx, providers):
+    """Drop the cached eligibility of providers after an activation failed."""
+    # A failed activation may be due to stale cached eligibility
+    for provider in providers:
+        pim.invalidate_eligibility_cache(cli_ctx, provider=provider)
+
+
+def _request_result(name, role, status, reason, duration, error=False):
+    result = OrderedDict(
+        [
+            ("groupName", name),
+            ("role", role),
+            ("status", status),
+            ("reason", reason),
+            ("duration", f"{duration} hours"),
+        ]
+    )
+    if error is not False:
+        result["error"] = error
+    return result
+
+
+def _parse_group_names(names):
+    """Split group names, which may come from an @file, into a list with one per line."""
+    if isinstance(names, str):
+        names = [names]
+
+    results = []
+    for value in names or []:
+        for line in value.splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and line not in results:
+                results.append(line)
+    return results
+
+
+def _is_group_pattern(name):
+    return name.startswith("re:") or any(c in name for c in "*?[")
+
+
+def _match_group_names(names, eligible, role):
+    """Resolve group names, globs and re: prefixed regexes to (name, assignment) pairs."""
+    import fnmatch
+    import re
+
+    eligible_names = [
+        group for group, group_role in eligible if group_role == role.lower()
+    ]
+
+    targets = OrderedDict()
+    for name in names:
+        if name.startswith("re:"):
+            try:
+                pattern = re.compile(name[3:])
+            except re.error as e:
+                raise CLIError(f"Invalid group name regex '{name[3:]}': {e}") from e
+            matches = [group for group in eligible_names if pattern.fullmatch(group)]
+        elif _is_group_pattern(name):
+            matches = [
+                group for group in eligible_names if fnmatch.fnmatchcase(group, name)
+            ]
+        else:
+            # Exact names with no eligible assignment are still reported
+            matches = [name]
+
+        for group in matches:
+            targets.setdefault(group, eligible.get((group, role.lower())))
+
+    return list(targets.items())
+
+
+def wait_pim(cmd, name, role="Member", timeout=3600, provider="groups"):
+    """Wait for the latest activation request for a PIM group to be approved and active."""
+    from azext_pim.client import get_sub_status
+
+    if timeout <= 0:
+        raise CLIError("Timeout must be greater than zero")
+
+    client = cf_pim(cmd.cli_ctx, provider=pim.PROVIDERS[provider])
+    request = client.get_latest_request(name, role)
+    if not request:
+        raise CLIError(f"No activation request found: {name} with role: {role}")
+
+    requested_at = request.requested_at
+    started = time.monotonic()
+    request = client.wait(request, timeout)
+
+    return OrderedDict(
+        [
+            ("groupName", name),
+            ("role", request.role or role),
+            ("status", get_sub_status(request)),
+            ("requestedAt", pim.format_datetime(requested_at)),
+            ("waited", f"{int(time.monotonic() - started)}s"),
+        ]
+    )
+
+
+def keepalive_pim(
+    cmd,
+    name=None,
+    reason=None,
+    duration=12,
+    role="Member",
+    margin=10,
+    max_renewals=5,
+    max_parallel=4,
+):
+    """Keep active PIM group activations alive by renewing them shortly before they expire."""
+    from datetime import datetime, timezone
+    from knack.log import get_logger
+    from azext_pim._keepalive import run_keepalive
+
+    logger = get_logger(__name__)
+
+    if duration <= 0:
+        raise CLIError("Duration must be greater than zero")
+    if margin < 0:
+        raise CLIError("Margin must not be negative")
+    if max_renewals < 1:
+        raise CLIError("Max renewals must be at least one")
+    if max_parallel < 1:
+        raise CLIError("Max parallel must be at least one")
+
+    client = cf_pim(cmd.cli_ctx)
+
+    # Only the active assignments with this role, optionally narrowed by name
+    active = {}
+    for assignment in client.iter_active():
+        if assignment.role.lower() == role.lower() and assignment.end:
+            active[(assignment.group_name, role.lower())] = assignment
+    targets = []
+    for group_name, target in _match_group_names(
+        _parse_group_names(name) or ["*"], active, role
+    ):
+        if target:
+            targets.append((group_name, target))
+        else:
+            logger.warning("No active group found: %s", group_name)
+    if not targets:
+        raise CLIError("No active groups found to keep alive")
+
+    activations = []
+    for group_name, assignment in targets:
+        activation_reason = reason
+        if not activation_reason:
+            latest = client.get_latest_request(group_name, role)
+            activation_reason = latest.reason if latest else None
+        if not activation_reason:
+            raise CLIError(
+                f"No previous activation reason found for {group_name}, specify --reason"
+            )
+        activations.append(
+            {
+                "groupName": group_name,
+                "role": role,
+                "assignment": assignment,
+                "reason": activation_reason,
+                "end": assignment.end.timestamp(),
+            }
+        )
+
+    logger.warning(
+        "Keeping %d activation(s) alive, press Ctrl+C to stop", len(activations)
+    )
+    try:
+        run_keepalive(
+            client, activations, margin * 60, duration, max_renewals, max_parallel
+        )
+    except KeyboardInterrupt:
+        logger.warning("Stopped keeping activations alive")
+
+    return [
+        OrderedDict(
+            [
+                ("groupName", activation["groupName"]),
+                ("role", activation["role"]),
+                ("renewals", activation["renewals"]),
+                (
+                    "expires",
+                    pim.format_datetime(
+                        datetime.fromtimestamp(activation["end"], timezone.utc)
+                    ),
+                ),
+                ("status", activation["status"]),
+            ]
+        )
+        for activation in activations
+    ]
+
+
+def export_pim(
+    cmd,
+    output_file=None,
+    export_format="ndjson",
+    include=None,
+    provider=None,
+    resume=False,
+):
+    """Export eligible and active assignments and all requests, row by row, as NDJSON or CSV."""
+    from azext_pim._export import EXPORT_KINDS, run_export
+
+    kinds = list(OrderedDict.fromkeys(include or EXPORT_KINDS))
+    providers = list(OrderedDict.fromkeys(provider or ["groups"]))
+    rows = run_export(cmd.cli_ctx, output_file, export_format, kinds, providers, resume)
+
+    # Rows written to stdout are the output, so there is nothing more to show
+    if not output_file:
+        return None
+    return OrderedDict([("file", output_file)] + list(rows.items()))
+
+
+def history_pim(
+    cmd,
+    name=None,
+    role=None,
+    status=None,
+    days=90,
+    provider=None,
+    refresh=False,
+    summary=False,
+):
+    """Show past activation requests from a local store, synced incrementally with PIM."""
+    import sqlite3
+    from contextlib import closing
+    from datetime import datetime, timezone
+    from knack.log import get_logger
+    from azext_pim import _history
+    from azext_pim._token_cache import account_key
+
+    logger = get_logger(__name__)
+
+    if days is not None and days <= 0:
+        raise CLIError("Days must be greater than zero")
+
+    providers = [pim.PROVIDERS[p] for p in OrderedDict.fromkeys(provider or ["groups"])]
+    account = account_key(cmd.cli_ctx)
+    try:
+        with closing(_history.connect(cmd.cli_ctx)) as db:
+            for p in providers:
+                try:
+                    _history.sync(
+                        cmd.cli_ctx,
+                        db,
+                        cf_pim(cmd.cli_ctx, provider=p),
+                        account,
+                        refresh,
+                    )
+                except (CLIError, sqlite3.OperationalError) as e:
+                    # The stored history can still answer, if there is any
+                    logger.warning(
+                        "Showing stored history, unable to sync %s: %s", p, e
+                    )
+
+            def when(timestamp):
+                if timestamp is None:
+                    return None
+                return pim.format_datetime(
+                    datetime.fromtimestamp(timestamp, timezone.utc)
+                )
+
+            short_names = {value: key for key, value in pim.PROVIDERS.items()}
+            provider_column = len(providers) > 1
+            filters = (name, role, status, days)
+
+            if summary:
+                rows = [
+                    OrderedDict(
+                        ([("provider", short_names[row[0]])] if provider_column else [])
+                        + [
+                            ("groupName", row[1]),
+                            ("role", row[2]),
+                            ("requests", row[3]),
+                            ("provisioned", row[4] or 0),
+                            ("lastRequestedAt", when(row[5])),
+                        ]
+                    )
+                    for row in _history.summarize(db, account, providers, *filters)
+                ]
+            else:
+                rows = [
+                    OrderedDict(
+                        ([("provider", short_names[row[0]])] if provider_column else [])
+                        + [
+                            ("groupName", row[1]),
+                            ("role", row[2]),
+                            ("requestedAt", when(row[3])),
+                            ("status", f"{row[4] or ''} {row[5] or ''}".strip()),
+                            ("reason", row[6]),
+                        ]
+                    )
+                    for row in _history.query(db, account, providers, *filters)
+                ]
+
+    except sqlite3.Error as e:
+        from azext_pim._cache import cache_path
+
+        path = cache_path(cmd.cli_ctx, _history.HISTORY_DB_FILE)
+        # The store only holds what was synced from the API, so is safe to delete
+        raise CLIError(f"Unable to use the history store {path}: {e}") from e
+
+    if not rows:
+        logger.warning("No activation requests found")
+
+    return rows
+
+
+def diag_pim(cmd, diag_command, profile_file=None, show_output=False):
+    """Run an az pim command and show where its time went, optionally profiling it."""
+    import shlex
+    from knack.log import get_logger
+    from azext_pim._diag import run_diag
+
+    rows = run_diag(cmd.cli_ctx, shlex.split(diag_command), profile_file, show_output)
+    if profile_file:
+        get_logger(__name__).warning(
+            "Profile saved to %s, view it with: python -m pstats %s",
+            profile_file,
+            profile_file,
+        )
+    return rows
+
+
+def broker_pim(cmd, idle_timeout=0):
+    """Run a local broker which shares tokens, connections and identical calls between commands."""
+    from azext_pim._broker import serve
+
+    if idle_timeout < 0:
+        raise CLIError("Idle timeout must not be negative")
+
+    stats = serve(cmd.cli_ctx, idle_timeout)
+    return OrderedDict(
+        [
+            ("requests", stats["requests"]),
+            ("coalesced", stats["coalesced"]),
+            ("apiCalls", stats["apiCalls"]),
+        ]
+    )
+
+
+def prompt_pim(cmd, refresh=False, prompt_format=None):
+    """Show active PIM groups for a shell prompt, from the local state file."""
+    from azext_pim import prompt
+
+    if refresh:
+        prompt.refresh_state(cmd.cli_ctx)
+    return prompt.read_prompt(
+        prompt_format, cmd.cli_ctx.config.config_dir, refresh=not refresh
+    )
@@ -3,51 +3,162 @@
 # Licensed under the MIT License. See LICENSE in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import base64
 import json
+import threading
+import time
 import urllib.parse
 from datetime import datetime, timezone
 from knack.util import CLIError
-from azure.cli.core._profile import Profile
-import requests
+from azext_pim._records import RoleAssignment, RoleAssignmentRequest, parse_datetime
 
 # PIM API Constants
 PIM_API_SCOPE = "https://api.azrbac.mspim.azure.com"
-PIM_API_BASE_URL = (
-    "https://api.azrbac.mspim.azure.com/api/v2/privilegedAccess/aadGroups"
-)
+PIM_API_BASE_URL = "https://api.azrbac.mspim.azure.com/api/v2/privilegedAccess"
+
+# PIM providers in the API, by the names used with --provider
+PROVIDERS = {
+    "groups": "aadGroups",
+    "roles": "aadroles",
+    "resources": "azureResources",
+}
+DEFAULT_PROVIDER = PROVIDERS["groups"]
+
+USER_ID_CACHE_FILE = "user_ids.json"
+ELIGIBILITY_CACHE_FILE = "eligibility.json"
+
+# Fields returned for each role assignment state, only those the commands use
+ASSIGNMENT_SELECT = {
+    "Eligible": ["resourceId", "memberType"],
+    "Active": ["id", "resourceId", "memberType", "endDateTime", "status"],
+}
+REQUEST_SELECT = ["id", "requestedDateTime", "status", "reason"]
+EXPAND_SELECT = {"resource": ["displayName"], "roleDefinition": ["id", "displayName"]}
+
+# Defaults for the `pim.eligibility_cache_ttl` and `pim.eligibility_cache_max_stale`
+# settings in seconds. Cached eligibility older than the TTL is still served, while
+# being refreshed in the background, until it is older than the max stale age
+DEFAULT_ELIGIBILITY_CACHE_TTL = 24 * 60 * 60
+DEFAULT_ELIGIBILITY_CACHE_MAX_STALE = 7 * 24 * 60 * 60
+
+# Bytes read at a time when decoding a page of results from the response stream
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Held while reading, changing and writing back a cache file, as tenants and providers
+# fill their entries concurrently
+_cache_lock = threading.Lock()
+
+
+def get_pim_token(cli_ctx, tenant=None):
+    """Get an access token for the PIM API, cached until close to expiry."""
+    from azext_pim._token_cache import get_token
+
+    return get_token(cli_ctx, PIM_API_SCOPE, tenant)
+
+
+def get_user_id(cli_ctx, tenant=None):
+    """Get the current user's object ID in a tenant, from the PIM token claims where possible."""
+    from azext_pim._broker import get_broker
+
+    broker = get_broker(cli_ctx)
+    user_id = broker.get_user_id(tenant) if broker else None
+    if user_id:
+        return user_id
+
+    user_id = _get_token_claims(get_pim_token(cli_ctx, tenant)).get("oid")
+    if user_id:
+        return user_id
+
+    # Fall back to a per-account cache, and finally the Graph signed-in user API
+    from azext_pim._cache import cache_path, load_json, save_json
+    from azext_pim._token_cache import account_key
+
+    path = cache_path(cli_ctx, USER_ID_CACHE_FILE)
+    user_ids = load_json(path, {})
+    key = account_key(cli_ctx, tenant)
+    if key in user_ids:
+        return user_ids[key]
+    if tenant:
+        # The Graph client only signs in to the current tenant
+        raise CLIError(f"Unable to determine the user ID in tenant {tenant}")
 
-
-def get_pim_token(cli_ctx):
-    """Get an access token for the PIM API."""
-    profile = Profile(cli_ctx=cli_ctx)
-
-    # Get access token for PIM API scope
-    token_info, _, _ = profile.get_raw_token(resource=PIM_API_SCOPE)
-    return token_info[1]
-
-
-def get_user_id(cli_ctx):
-    """Get the current user's object ID using Microsoft Graph signed-in user API."""
     from azext_pim._client_factory import _graph_client_factory
-
-    client = _graph_client_factory(cli_ctx)
-    user = client.signed_in_user_get()
+    from azext_pim._trace import span
+
+    with span(cli_ctx, "graph signed-in user"):
+        client = _graph_client_factory(cli_ctx)
+        user = client.signed_in_user_get()
+    with _cache_lock:
+        user_ids = load_json(path, {})
+        user_ids[key] = user["id"]
+        save_json(path, user_ids)
     return user["id"]
 
 
-def pim_api_request(cli_ctx, method, url, body=None):
-    """Make an authenticated request to the PIM API."""
-    token = get_pim_token(cli_ctx)
+def _get_token_claims(token):
+    """Decode the claims of a JWT access token, without validating it."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError):
+        return {}
+
+
+def pim_api_request(
+    cli_ctx,
+    method,
+    url,
+    body=None,
+    timeout=None,
+    headers=None,
+    stream=False,
+    tenant=None,
+):
+    """Make an authenticated request to the PIM API, retrying throttled and transient failures.
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    Returns the decoded JSON body, or with stream=True the unread response for the caller
+    to decode and close. The token is for the current tenant unless another is given.
+    When a local broker is listening the call goes through it, otherwise it is direct.
+    """
+    import requests
+    from azext_pim._broker import get_broker
+    from azext_pim._session import send_request
 
-    if method.upper() == "GET":
-        response = requests.get(url, headers=headers)
-    elif method.upper() == "POST":
-        response = requests.post(url, headers=headers, json=body)
-    else:
+    if method.upper() not in ("GET", "POST"):
         raise CLIError(f"Unsupported HTTP method: {method}")
 
+    broker = get_broker(cli_ctx)
+    response = (
+        broker.request(method.upper(), url, body, headers, tenant) if broker else None
+    )
+
+    if response is None:
+        token = get_pim_token(cli_ctx, tenant)
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            **(headers or {}),
+        }
+        try:
+            response = send_request(
+                cli_ctx,
+                method.upper(),
+                url,
+                timeout=timeout,
+                headers=headers,
+                json=body,
+                stream=stream,
+            )
+        except requests.exceptions.Timeout as e:
+            raise CLIError(f"PIM API request timed out: {e}") from e
+        except requests.exceptions.ConnectionError as e:
+            raise CLIError(f"Unable to connect to the PIM API: {e}") from e
+
+    # Unchanged since the ETag sent in If-None-Match, so the caller keeps its copy
+    if response.status_code == 304 and stream:
+        return response
+
     if response.status_code < 200 or response.status_code >= 300:
         try:
             error_data = response.json()
@@ -57,6 +168,8 @@ def pim_api_request(cli_ctx, method, url, body=None):
             pass
         raise CLIError(f"PIM API error: {response.status_code} - {response.text}")
 
+    if stream:
+        return response
     if response.text:
         return response.json()
     return None
@@ -64,32 +177,337 @@ def pim_api_request(cli_ctx, method, url, body=None):
 
 def get_role_assignments(cli_ctx, user_id, assignment_state):
     """Get role assignments for the current user."""
-    filter_query = f"subjectId eq '{user_id}'"
+    return list(iter_role_assignments(cli_ctx, user_id, assignment_state))
+
+
+def iter_role_assignments(
+    cli_ctx,
+    user_id,
+    assignment_state,
+    page_size=None,
+    group_name=None,
+    tenant=None,
+    provider=DEFAULT_PROVIDER,
+    position=None,
+    validator=None,
+    select=None,
+):
+    """Iterate over role assignments for the current user from a provider, a page at a time.
+
+    The fields selected default to those the commands use for the assignment state.
+    """
+    filters = [f"subjectId eq {_quote_odata(user_id)}"]
     if assignment_state:
-        filter_query += f" and assignmentState eq '{assignment_state}'"
+        filters.append(f"assignmentState eq {_quote_odata(assignment_state)}")
+    if group_name:
+        filters.append(f"resource/displayName eq {_quote_odata(group_name)}")
 
-    url = f"{PIM_API_BASE_URL}/roleAssignments?$filter={urllib.parse.quote(filter_query)}&$expand=resource,roleDefinition"
+    url = build_query_url(
+        "roleAssignments",
+        filters,
+        select or ASSIGNMENT_SELECT.get(assignment_state),
+        EXPAND_SELECT,
+        provider,
+    )
 
-    response = pim_api_request(cli_ctx, "GET", url)
-    return response.get("value", [])
+    return (
+        RoleAssignment.from_api(item, provider)
+        for item in iter_pages(cli_ctx, url, page_size, tenant, position, validator)
+    )
 
 
 def get_role_assignment_requests(cli_ctx, user_id, status):
     """Get role assignment requests for the current user."""
-    filter_query = f"subjectId eq '{user_id}'"
-    if status:
-        filter_query += f" and status/subStatus eq '{status}'"
+    return list(iter_role_assignment_requests(cli_ctx, user_id, status))
+
+
+def iter_role_assignment_requests(
+    cli_ctx,
+    user_id,
+    status,
+    page_size=None,
+    group_name=None,
+    tenant=None,
+    provider=DEFAULT_PROVIDER,
+    position=None,
+    since=None,
+    validator=None,
+):
+    """Iterate over role assignment requests for the current user to a provider, a page at a time.
 
-    url = f"{PIM_API_BASE_URL}/roleAssignmentRequests?$filter={urllib.parse.quote(filter_query)}&$expand=resource,roleDefinition"
+    Only requests made at or after the since datetime are returned, when one is given.
+    """
+    filters = [f"subjectId eq {_quote_odata(user_id)}"]
+    if status:
+        filters.append(f"status/subStatus eq {_quote_odata(status)}")
+    if group_name:
+        filters.append(f"resource/displayName eq {_quote_odata(group_name)}")
+    if since:
+        # OData datetime literals are not quoted
+        filters.append(
+            f"requestedDateTime ge {since.astimezone(timezone.utc):%Y-%m-%dT%H:%M:%SZ}"
+        )
+
+    url = build_query_url(
+        "roleAssignmentRequests", filters, REQUEST_SELECT, EXPAND_SELECT, provider
+    )
+
+    return (
+        RoleAssignmentRequest.from_api(item, provider)
+        for item in iter_pages(cli_ctx, url, page_size, tenant, position, validator)
+    )
+
+
+def get_role_assignment_request(
+    cli_ctx, request_id, tenant=None, provider=DEFAULT_PROVIDER
+):
+    """Get a single role assignment request by ID."""
+    url = build_query_url(
+        f"roleAssignmentRequests/{urllib.parse.quote(request_id)}",
+        None,
+        REQUEST_SELECT,
+        EXPAND_SELECT,
+        provider,
+    )
+    return RoleAssignmentRequest.from_api(
+        pim_api_request(cli_ctx, "GET", url, tenant=tenant), provider
+    )
+
+
+def get_latest_role_assignment_request(
+    cli_ctx, user_id, group_name, role, tenant=None, provider=DEFAULT_PROVIDER
+):
+    """Get the most recent role assignment request for a group and role, if any."""
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    latest = None
+    for request in iter_role_assignment_requests(
+        cli_ctx, user_id, None, group_name=group_name, tenant=tenant, provider=provider
+    ):
+        if (request.role or "").lower() != role.lower():
+            continue
+        if latest is None or (request.requested_at or oldest) > (
+            latest.requested_at or oldest
+        ):
+            latest = request
+    return latest
+
+
+def build_query_url(
+    entity, filters, select=None, expand=None, provider=DEFAULT_PROVIDER
+):
+    """Build a PIM API query URL, with $select and $expand projections to trim payloads."""
+    params = []
+    if filters:
+        params.append(f"$filter={urllib.parse.quote(' and '.join(filters))}")
+    if select:
+        params.append(f"$select={','.join(select)}")
+    if expand:
+        params.append(
+            "$expand="
+            + ",".join(
+                f"{name}($select={','.join(fields)})" if fields else name
+                for name, fields in expand.items()
+            )
+        )
+    return f"{PIM_API_BASE_URL}/{provider}/{entity}?{'&'.join(params)}"
+
+
+def _quote_odata(value):
+    """Quote a string literal for use in an OData $filter."""
+    value = value.replace("'", "''")
+    return f"'{value}'"
+
+
+def iter_pages(
+    cli_ctx, url, page_size=None, tenant=None, position=None, validator=None
+):
+    """Iterate over the items of a paged PIM API query, following continuation links.
+
+    Items are decoded from the response as it arrives, so only part of one page is held
+    in memory at a time. A position dict is kept updated with the URL of the page being
+    read, and iteration starts from its URL if it has one, so a caller can resume later.
+
+    A validator dict makes the query conditional on its ETag, from an earlier result. It
+    is updated with the ETag of this result, and "modified" is False if the service
+    answered 304 Not Modified, when nothing is yielded. An ETag is only kept for a result
+    of one page, as it says nothing about the pages after it.
+    """
+    import requests
+    from azext_pim._stream import iter_json_array
+
+    page_size = page_size or cli_ctx.config.getint("pim", "page_size", fallback=0)
+
+    # Ask for a maximum page size rather than using $top, which limits the total
+    headers = {"Prefer": f"odata.maxpagesize={page_size}"} if page_size else None
+
+    if position is not None:
+        url = position.get("url") or url
+
+    first_page = validator is not None
+    while url:
+        if position is not None:
+            position["url"] = url
+        page = {}
+        page_headers = headers
+        if first_page and validator.get("etag"):
+            page_headers = {**(headers or {}), "If-None-Match": validator["etag"]}
+        response = pim_api_request(
+            cli_ctx, "GET", url, headers=page_headers, stream=True, tenant=tenant
+        )
+        with response:
+            if first_page:
+                if response.status_code == 304:
+                    validator["modified"] = False
+                    return
+                validator.update(etag=response.headers.get("ETag"), modified=True)
+            try:
+                yield from iter_json_array(
+                    response.iter_content(STREAM_CHUNK_SIZE), "value", page
+                )
+            except requests.exceptions.RequestException as e:
+                raise CLIError(f"Unable to read the PIM API response: {e}") from e
+            except ValueError as e:
+                raise CLIError(f"Invalid response from the PIM API: {e}") from e
+        url = page.get("@odata.nextLink")
+        if url and first_page:
+            validator["etag"] = None
+        first_page = False
+
+
+def get_eligible_assignments(
+    cli_ctx,
+    user_id,
+    refresh=False,
+    group_name=None,
+    tenant=None,
+    provider=DEFAULT_PROVIDER,
+):
+    """Get eligible role assignments for the current user, from the local cache when possible.
+
+    Without the cache a group name filters the query on the server, otherwise it is ignored
+    and all eligible assignments are returned.
+    """
+    ttl = get_eligibility_cache_ttl(cli_ctx)
+    if ttl <= 0:
+        return list(
+            iter_role_assignments(
+                cli_ctx,
+                user_id,
+                "Eligible",
+                group_name=group_name,
+                tenant=tenant,
+                provider=provider,
+            )
+        )
+
+    from azext_pim._cache import cache_path, load_json
+
+    path = cache_path(cli_ctx, ELIGIBILITY_CACHE_FILE)
+    key = _eligibility_cache_key(cli_ctx, tenant, provider)
+    entry = load_json(path, {}).get(key)
+
+    if entry and not refresh and entry.get("userId") == user_id:
+        age = time.time() - entry["fetchedAt"]
+        if age < ttl:
+            return [RoleAssignment.from_api(a, provider) for a in entry["assignments"]]
+
+        max_stale = cli_ctx.config.getint(
+            "pim",
+            "eligibility_cache_max_stale",
+            fallback=DEFAULT_ELIGIBILITY_CACHE_MAX_STALE,
+        )
+        if age < max_stale:
+            # Serve stale data now, the refresh finishes before the process exits
+            threading.Thread(
+                target=_refresh_eligible_assignments,
+                args=(cli_ctx, user_id, path, key, True, tenant, provider),
+                name="pim-eligibility-refresh",
+            ).start()
+            return [RoleAssignment.from_api(a, provider) for a in entry["assignments"]]
+
+    return _refresh_eligible_assignments(
+        cli_ctx, user_id, path, key, tenant=tenant, provider=provider
+    )
+
+
+def get_eligibility_cache_ttl(cli_ctx):
+    """Get the eligibility cache TTL in seconds, zero or less when the cache is disabled."""
+    return cli_ctx.config.getint(
+        "pim", "eligibility_cache_ttl", fallback=DEFAULT_ELIGIBILITY_CACHE_TTL
+    )
+
+
+def invalidate_eligibility_cache(cli_ctx, tenant=None, provider=DEFAULT_PROVIDER):
+    """Remove the current account's cached eligible role assignments for a tenant."""
+    from azext_pim._cache import cache_path, load_json, save_json
+
+    path = cache_path(cli_ctx, ELIGIBILITY_CACHE_FILE)
+    key = _eligibility_cache_key(cli_ctx, tenant, provider)
+    with _cache_lock:
+        entries = load_json(path, {})
+        if entries.pop(key, None) is not None:
+            save_json(path, entries)
+
+
+def _eligibility_cache_key(cli_ctx, tenant, provider):
+    from azext_pim._token_cache import account_key
+
+    # Groups are keyed by the account alone, as they were before other providers
+    if provider == DEFAULT_PROVIDER:
+        return account_key(cli_ctx, tenant)
+    return f"{account_key(cli_ctx, tenant)}/{provider}"
+
+
+def _refresh_eligible_assignments(
+    cli_ctx,
+    user_id,
+    path,
+    key,
+    background=False,
+    tenant=None,
+    provider=DEFAULT_PROVIDER,
+):
+    """Fetch eligible role assignments and store the fields we use in the cache."""
+    from azext_pim._cache import load_json, save_json
 
-    response = pim_api_request(cli_ctx, "GET", url)
-    return response.get("value", [])
+    try:
+        assignments = list(
+            iter_role_assignments(
+                cli_ctx, user_id, "Eligible", tenant=tenant, provider=provider
+            )
+        )
+    except CLIError as e:
+        if not background:
+            raise
+        from knack.log import get_logger
+
+        get_logger(__name__).debug("Background eligibility refresh failed: %s", e)
+        return None
+
+    entry = {
+        "userId": user_id,
+        "fetchedAt": time.time(),
+        "assignments": [assignment.to_api() for assignment in assignments],
+    }
+    with _cache_lock:
+        entries = load_json(path, {})
+        entries[key] = entry
+        save_json(path, entries)
+    return assignments
 
 
 def create_role_assignment_request(
-    cli_ctx, role_definition_id, resource_id, user_id, reason, duration_hours
+    cli_ctx,
+    role_definition_id,
+    resource_id,
+    user_id,
+    reason,
+    duration_hours,
+    request_type="UserAdd",
+    tenant=None,
+    provider=DEFAULT_PROVIDER,
 ):
-    """Create a role assignment request to activate a PIM group."""
+    """Create a role assignment request to activate, or extend with UserExtend, a PIM role."""
     # Convert duration (in hours) to ISO 8601 duration format (e.g., PT720M)
     duration_minutes = int(duration_hours * 60)
     iso_duration = f"PT{duration_minutes}M"
@@ -100,7 +518,7 @@ def create_role_assignment_request(
         "resourceId": resource_id,
         "subjectId": user_id,
         "assignmentState": "Active",
-        "type": "UserAdd",
+        "type": request_type,
         "reason": reason,
         "schedule": {
             "type": "Once",
@@ -110,29 +528,31 @@ def create_role_assignment_request(
         },
     }
 
-    url = f"{PIM_API_BASE_URL}/roleAssignmentRequests"
+    url = f"{PIM_API_BASE_URL}/{provider}/roleAssignmentRequests"
 
-    response = pim_api_request(cli_ctx, "POST", url, request_body)
-    return response
+    response = pim_api_request(cli_ctx, "POST", url, request_body, tenant=tenant)
+    return RoleAssignmentRequest.from_api(response, provider)
 
 
-def format_datetime(dt_str):
-    """Format datetime string for display."""
-    if not dt_str:
+def format_datetime(dt):
+    """Format a datetime, or datetime string, for display."""
+    if not dt:
         return "Never expires"
+    if isinstance(dt, str):
+        dt = parse_datetime(dt) or dt
     try:
-        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
         return dt.strftime("%H:%M, %b %d")
     except:
-        return dt_str
+        return dt
 
 
-def calculate_time_remaining(dt_str):
-    """Calculate time remaining until expiration."""
-    if not dt_str:
+def calculate_time_remaining(dt):
+    """Calculate time remaining until expiration, from a datetime or datetime string."""
+    if not dt:
         return "N/A"
     try:
-        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+        if isinstance(dt, str):
+            dt = parse_datetime(dt)
         remaining = dt - datetime.now(timezone.utc)
 
         if remaining.total_seconds() < 0:
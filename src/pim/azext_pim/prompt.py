@@ -0,0 +1,238 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Shell prompt segment showing active PIM groups, read from a local state file.
+
+Reading the segment only uses the standard library, and never calls the PIM API or loads
+the Azure CLI, so it is fast enough to run for every prompt. Run this file directly, e.g.
+`python ~/.azure/cliextensions/pim/azext_pim/prompt.py`, to also skip importing the Azure
+CLI through the azext_pim package. When the state is older than the refresh interval a
+background `az pim prompt --refresh` updates it, and a file lock ensures only one runs.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+STATE_FILE = "prompt.json"
+LOCK_FILE = "prompt.lock"
+
+# Default for the `pim.prompt_refresh_interval` setting in seconds
+DEFAULT_REFRESH_INTERVAL = 60
+
+# Seconds after which a background refresh which has not finished is started again
+REFRESH_TIMEOUT = 120
+
+
+def read_prompt(template=None, config_dir=None, refresh=True):
+    """Render the prompt segment from the state file, refreshing it in the background if stale.
+
+    The template can use the {active}, {active_count}, {pending} and {pending_count} fields,
+    and defaults to the `pim.prompt_format` setting, or the active groups with the time
+    remaining followed by the number of pending requests. Nothing is shown when there are
+    neither.
+    """
+    config_dir = config_dir or get_config_dir()
+    path = os.path.join(config_dir, "pim", STATE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    now = time.time()
+    if refresh:
+        interval = float(
+            _get_setting(
+                config_dir, "prompt_refresh_interval", DEFAULT_REFRESH_INTERVAL
+            )
+        )
+        if now - state.get("checkedAt", 0) >= interval:
+            start_refresh(config_dir, state.get("checkedAt", 0))
+
+    return render_prompt(
+        state, template or _get_setting(config_dir, "prompt_format"), now
+    )
+
+
+def render_prompt(state, template=None, now=None):
+    """Render the prompt segment for a state, leaving out activations which have expired."""
+    now = now or time.time()
+    active = [
+        _format_activation(activation, now)
+        for activation in state.get("active", [])
+        if activation.get("end") is None or activation["end"] > now
+    ]
+    pending_count = len(state.get("pending", []))
+    if not active and not pending_count:
+        return ""
+
+    fields = {
+        "active": ", ".join(active),
+        "active_count": len(active),
+        "pending": f"+{pending_count} pending" if pending_count else "",
+        "pending_count": pending_count,
+    }
+    if template:
+        return template.format(**fields)
+    return " ".join(field for field in (fields["active"], fields["pending"]) if field)
+
+
+def start_refresh(config_dir, checked_at=0):
+    """Start `az pim prompt --refresh` in the background, unless one is already running."""
+    import shutil
+    import subprocess
+
+    lock_path = os.path.join(config_dir, "pim", LOCK_FILE)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+    # The lock file is touched when a refresh is started, so concurrent shells start one
+    try:
+        started_at = os.path.getmtime(lock_path)
+    except OSError:
+        started_at = 0
+    if started_at > checked_at and time.time() - started_at < REFRESH_TIMEOUT:
+        return False
+
+    with file_lock(lock_path) as locked:
+        if not locked:
+            return False
+        os.utime(lock_path)
+
+    az = shutil.which("az")
+    if not az:
+        return False
+
+    if os.name == "nt":
+        kwargs = {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    else:
+        kwargs = {"start_new_session": True}
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [az, "pim", "prompt", "--refresh", "--only-show-errors", "--output", "none"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, AZURE_CONFIG_DIR=config_dir),
+        **kwargs,
+    )
+    return True
+
+
+def refresh_state(cli_ctx):
+    """Update the state file with the active and pending activations from the PIM API.
+
+    Returns False without calling the API if another process is already refreshing it.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from knack.util import CLIError
+    from azext_pim._cache import cache_path, load_json, save_json
+    from azext_pim._client_factory import cf_pim
+
+    path = cache_path(cli_ctx, STATE_FILE)
+    with file_lock(cache_path(cli_ctx, LOCK_FILE)) as locked:
+        if not locked:
+            return False
+
+        state = load_json(path, {})
+        state["checkedAt"] = time.time()
+        client = cf_pim(cli_ctx)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                active_future = executor.submit(client.list_active)
+                pending_future = executor.submit(client.list_pending)
+                active, pending = active_future.result(), pending_future.result()
+        except CLIError as e:
+            # Keep showing the last known state, and wait for the interval to try again
+            state["error"] = str(e)
+            save_json(path, state)
+            raise
+
+        state.update(
+            updatedAt=state["checkedAt"],
+            error=None,
+            active=[
+                {
+                    "groupName": assignment.group_name,
+                    "role": assignment.role,
+                    "end": assignment.end.timestamp() if assignment.end else None,
+                }
+                for assignment in active
+            ],
+            pending=[
+                {"groupName": request.group_name, "role": request.role}
+                for request in pending
+            ],
+        )
+        save_json(path, state)
+        return True
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on a file without waiting, yielding False if it is already held."""
+    with open(path, "a", encoding="utf-8") as f:
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        # The lock is released when the file is closed
+        yield True
+
+
+def get_config_dir():
+    """Get the Azure CLI config directory, without loading the Azure CLI."""
+    return os.environ.get("AZURE_CONFIG_DIR") or os.path.expanduser(
+        os.path.join("~", ".azure")
+    )
+
+
+def _get_setting(config_dir, option, fallback=None):
+    """Read a `pim` setting from the environment or the CLI config file, as the CLI does."""
+    value = os.environ.get(f"AZURE_PIM_{option.upper()}")
+    if value is not None:
+        return value
+
+    import configparser
+
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(os.path.join(config_dir, "config"), encoding="utf-8")
+    return config.get("pim", option, fallback=fallback)
+
+
+def _format_activation(activation, now):
+    text = activation["groupName"]
+    if activation.get("role") and activation["role"].lower() != "member":
+        text += f" ({activation['role']})"
+    if activation.get("end") is not None:
+        remaining = int(activation["end"] - now) // 60
+        text += (
+            f" {remaining // 60}h{remaining % 60:02d}m"
+            if remaining >= 60
+            else f" {remaining}m"
+        )
+    return text
+
+
+def main():
+    """Print the prompt segment, optionally with a template as the first argument."""
+    sys.stdout.write(read_prompt(sys.argv[1] if len(sys.argv) > 1 else None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import sys
+import types
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "pim")
+)
+
+
+class FakeConfig:
+    """Stand-in for the CLI config, returning fallbacks apart from the given settings."""
+
+    def __init__(self, config_dir, settings=None):
+        self.config_dir = config_dir
+        self.settings = settings or {}
+
+    def get(self, section, option, fallback=None):
+        return self.settings.get(f"{section}.{option}", fallback)
+
+    getint = getfloat = getboolean = get
+
+
+@pytest.fixture
+def settings():
+    """Settings for the fake CLI config, as section.option keys."""
+    return {}
+
+
+@pytest.fixture
+def cli_ctx(tmp_path, settings):
+    return types.SimpleNamespace(config=FakeConfig(str(tmp_path), settings))
@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import os
+import time
+import types
+import pytest
+from azext_pim import _broker, _session, _token_cache
+from azext_pim.pim import PIM_API_BASE_URL
+
+URL = f"{PIM_API_BASE_URL}/aadGroups/roleAssignments"
+
+
+class FakeProfile:
+    """Stand-in for the CLI Profile, signed in as whichever account the profile has loaded."""
+
+    def __init__(self, cli_ctx=None, **_):
+        from azure.cli.core._profile import ACCOUNT
+
+        self.storage = ACCOUNT
+
+    def get_subscription(self):
+        return self.storage.get("subscriptions")[0]
+
+    def get_raw_token(self, resource=None, tenant=None, **_):
+        user = self.get_subscription()["user"]["name"]
+        entry = {"expires_on": int(time.time()) + 3600}
+        return ("Bearer", f"token-{user}", entry), None, "home-tenant"
+
+
+def write_profile(cli_ctx, user):
+    path = os.path.join(cli_ctx.config.config_dir, "azureProfile.json")
+    subscription = {"tenantId": "home-tenant", "user": {"name": user}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"subscriptions": [subscription]}, f)
+    return path
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """The Authorization header of each call the broker makes to the PIM API."""
+    calls = []
+
+    def send_request(cli_ctx, method, url, headers=None, **_):
+        calls.append(headers["Authorization"])
+        return types.SimpleNamespace(status_code=200, headers={}, content=b"{}")
+
+    monkeypatch.setattr(_session, "send_request", send_request)
+    return calls
+
+
+@pytest.fixture
+def broker(cli_ctx, monkeypatch):
+    from azure.cli.core import _profile
+
+    monkeypatch.setattr(_profile, "Profile", FakeProfile)
+    monkeypatch.setattr(_profile.ACCOUNT, "data", {})
+    monkeypatch.setattr(_profile.ACCOUNT, "filename", None)
+    _profile.ACCOUNT.load(write_profile(cli_ctx, "alice@example.com"))
+    _token_cache.clear_tokens()
+    yield _broker._Broker(cli_ctx)
+    _token_cache.clear_tokens()
+
+
+def call(broker, account, url=URL):
+    wfile = io.BytesIO()
+    message = {"op": "request", "method": "GET", "url": url, "account": account}
+    broker.handle(io.BytesIO(json.dumps(message).encode() + b"\n"), wfile)
+    header, _, body = wfile.getvalue().partition(b"\n")
+    return json.loads(header), body
+
+
+def test_call_is_made_as_the_signed_in_account(broker, sent):
+    header, body = call(broker, "home-tenant/alice@example.com")
+
+    assert header["status"] == 200
+    assert body == b"{}"
+    assert sent == ["Bearer token-alice@example.com"]
+
+
+def test_account_changed_while_running_is_loaded_from_disk(cli_ctx, broker, sent):
+    call(broker, "home-tenant/alice@example.com")
+    # az login in another shell only changes the profile on disk
+    write_profile(cli_ctx, "bob@example.com")
+
+    header, _ = call(broker, "home-tenant/bob@example.com")
+
+    assert header["status"] == 200
+    assert sent == ["Bearer token-alice@example.com", "Bearer token-bob@example.com"]
+
+
+def test_call_from_another_account_is_refused(cli_ctx, broker, sent):
+    call(broker, "home-tenant/alice@example.com")
+    write_profile(cli_ctx, "bob@example.com")
+    call(broker, "home-tenant/bob@example.com")
+
+    # A command started before the switch is still signed in as the old account
+    header, _ = call(broker, "home-tenant/alice@example.com")
+
+    assert "bob@example.com" in header["refused"]
+    assert sent == ["Bearer token-alice@example.com", "Bearer token-bob@example.com"]
+
+
+def test_client_calls_directly_when_refused(cli_ctx, broker, monkeypatch):
+    import socket
+
+    class FakeSocket:
+        def __init__(self, *_):
+            self.sent = b""
+
+        def settimeout(self, _):
+            pass
+
+        def connect(self, _):
+            pass
+
+        def sendall(self, data):
+            self.sent += data
+
+        def makefile(self, _):
+            return io.BytesIO(b'{"refused": "signed in as someone else"}\n')
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(socket, "socket", FakeSocket)
+    monkeypatch.setattr(_broker, "_unavailable", False)
+    client = _broker.BrokerClient(cli_ctx, "broker.sock")
+
+    assert client.request("GET", URL) is None
+    # Only this call goes direct, the broker is tried again for the next
+    assert _broker._unavailable is False
+
+
+def test_url_outside_the_pim_api_is_refused_before_the_token(broker, sent, monkeypatch):
+    from azext_pim import pim
+
+    tokens = []
+    monkeypatch.setattr(pim, "get_pim_token", lambda *args: tokens.append(args))
+
+    header, _ = call(
+        broker, "home-tenant/alice@example.com", "https://example.com/steal"
+    )
+
+    assert "only calls the PIM API" in header["error"]
+    assert not tokens
+    assert not sent
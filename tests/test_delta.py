@@ -0,0 +1,187 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from azext_pim import _delta, _token_cache
+from azext_pim._cache import load_json, save_json
+from azext_pim._records import RoleAssignment, RoleAssignmentRequest
+
+END = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeClient:
+    """Stand-in for PimClient, answering 304 Not Modified when the ETag still matches."""
+
+    tenant = None
+    provider = "aadGroups"
+
+    def __init__(self, records, etag=None):
+        self.records = records
+        self.etag = etag
+        self.sent_etags = []
+
+    def iter_active(self, validator=None):
+        return self._iter(validator)
+
+    def iter_pending(self, validator=None):
+        return self._iter(validator)
+
+    def _iter(self, validator):
+        self.sent_etags.append(validator.get("etag"))
+        if self.etag and validator.get("etag") == self.etag:
+            validator["modified"] = False
+            return
+        validator.update(etag=self.etag, modified=True)
+        yield from self.records
+
+
+def assignment(assignment_id, group_name="Prod", end=END, status="Provisioned"):
+    return RoleAssignment(
+        "group-id",
+        group_name,
+        "member",
+        "Member",
+        "Group",
+        end,
+        status,
+        assignment_id=assignment_id,
+    )
+
+
+def changes(cli_ctx, client, view="active"):
+    return [
+        (change, record.id)
+        for change, record in _delta.get_changes(cli_ctx, client, view)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def account(monkeypatch):
+    monkeypatch.setattr(
+        _token_cache, "account_key", lambda cli_ctx, tenant=None: "tenant/user"
+    )
+
+
+def test_first_run_adds_every_row(cli_ctx):
+    client = FakeClient([assignment("a"), assignment("b")])
+
+    assert changes(cli_ctx, client) == [("Added", "a"), ("Added", "b")]
+
+
+def test_unchanged_rows_are_not_shown(cli_ctx):
+    client = FakeClient([assignment("a"), assignment("b")])
+    changes(cli_ctx, client)
+
+    assert changes(cli_ctx, client) == []
+
+
+def test_added_changed_and_removed_rows(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a"), assignment("b"), assignment("c")]))
+    client = FakeClient(
+        [
+            assignment("a", end=END + timedelta(hours=8)),
+            assignment("c"),
+            assignment("d"),
+        ]
+    )
+
+    assert changes(cli_ctx, client) == [
+        ("Changed", "a"),
+        ("Added", "d"),
+        ("Removed", "b"),
+    ]
+
+
+def test_status_change_is_a_change(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")]))
+
+    assert changes(cli_ctx, FakeClient([assignment("a", status="Revoked")])) == [
+        ("Changed", "a")
+    ]
+
+
+def test_removed_row_is_shown_as_it_last_was(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a", group_name="Ops")]))
+
+    ((change, record),) = _delta.get_changes(cli_ctx, FakeClient([]), "active")
+
+    assert change == "Removed"
+    assert (record.id, record.group_name, record.role, record.end) == (
+        "a",
+        "Ops",
+        "Member",
+        END,
+    )
+    assert (record.member_type, record.status, record.provider) == (
+        "Group",
+        "Provisioned",
+        "aadGroups",
+    )
+
+
+def test_request_changes(cli_ctx):
+    pending = RoleAssignmentRequest(
+        "r1", "Prod", "Member", END, "PendingApproval", "PendingApproval", "On call"
+    )
+    changes(cli_ctx, FakeClient([pending]), "pending")
+
+    approved = RoleAssignmentRequest(
+        "r1", "Prod", "Member", END, "Provisioned", "Provisioned", "On call"
+    )
+    assert changes(cli_ctx, FakeClient([approved]), "pending") == [("Changed", "r1")]
+
+    ((change, record),) = _delta.get_changes(cli_ctx, FakeClient([]), "pending")
+    assert change == "Removed"
+    assert (record.id, record.requested_at, record.reason) == ("r1", END, "On call")
+
+
+def test_not_modified_downloads_and_compares_nothing(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")], etag='W/"1"'))
+    # Rows which would show as changes, if they were compared
+    client = FakeClient([assignment("b")], etag='W/"1"')
+
+    assert changes(cli_ctx, client) == []
+    assert client.sent_etags == ['W/"1"']
+
+
+def test_not_modified_keeps_the_state(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")], etag='W/"1"'))
+    changes(cli_ctx, FakeClient([], etag='W/"1"'))
+
+    # The row is still known, so only the new one is added once the ETag changes
+    client = FakeClient([assignment("a"), assignment("b")], etag='W/"2"')
+    assert changes(cli_ctx, client) == [("Added", "b")]
+
+
+def test_new_etag_is_sent_next_run(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")], etag='W/"1"'))
+    changes(cli_ctx, FakeClient([assignment("a")], etag='W/"2"'))
+    client = FakeClient([assignment("a")], etag='W/"2"')
+
+    changes(cli_ctx, client)
+
+    assert client.sent_etags == ['W/"2"']
+
+
+def test_state_from_another_version_is_a_first_run(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")], etag='W/"1"'))
+    path = os.path.join(cli_ctx.config.config_dir, "pim", _delta.DELTA_STATE_FILE)
+    entries = load_json(path)
+    for entry in entries.values():
+        entry["version"] = _delta.DELTA_STATE_VERSION - 1
+    save_json(path, entries)
+    client = FakeClient([assignment("a")], etag='W/"1"')
+
+    # Neither the old ETag nor the old rows are used
+    assert changes(cli_ctx, client) == [("Added", "a")]
+    assert client.sent_etags == [None]
+
+
+def test_views_are_kept_apart(cli_ctx):
+    changes(cli_ctx, FakeClient([assignment("a")]), "active")
+
+    assert changes(cli_ctx, FakeClient([]), "pending") == []
@@ -0,0 +1,134 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import csv
+import json
+import os
+import pytest
+from knack.util import CLIError
+from azext_pim import _client_factory, _export
+from azext_pim._records import RoleAssignment
+
+PAGE_SIZE = 3
+ROWS = {"eligible": 8, "active": 5}
+
+
+class FakeClient:
+    """Stand-in for PimClient, listing pages of assignments and failing once when told.
+
+    The position is updated with the URL of each page before its records, as iter_pages
+    does, and listing starts again from the page in the position.
+    """
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.listed = 0
+
+    def iter_eligible(self, position, select=None):
+        return self._iter_pages("eligible", position)
+
+    def iter_active(self, position, select=None):
+        return self._iter_pages("active", position)
+
+    def _iter_pages(self, kind, position):
+        ids = [f"{kind}-{i}" for i in range(ROWS[kind])]
+        pages = [ids[i : i + PAGE_SIZE] for i in range(0, len(ids), PAGE_SIZE)]
+        urls = [f"https://pim.example.com/{kind}?page={i}" for i in range(len(pages))]
+        start = urls.index(position["url"]) if position.get("url") else 0
+        for url, page in zip(urls[start:], pages[start:]):
+            position["url"] = url
+            for assignment_id in page:
+                if self.listed == self.fail_at:
+                    self.fail_at = None
+                    raise CLIError("Unable to connect to the PIM API")
+                self.listed += 1
+                yield RoleAssignment(
+                    "group-id", "Prod", "member", "Member", assignment_id=assignment_id
+                )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(_client_factory, "cf_pim", lambda cli_ctx, provider: client)
+    return client
+
+
+def export(cli_ctx, path, export_format, resume=False):
+    kinds = list(ROWS)
+    return _export.run_export(cli_ctx, path, export_format, kinds, ["groups"], resume)
+
+
+def exported_ids(path, export_format):
+    with open(path, encoding="utf-8", newline="") as f:
+        if export_format == "csv":
+            return [row["id"] for row in csv.DictReader(f)]
+        return [json.loads(line)["id"] for line in f]
+
+
+def all_ids():
+    return [f"{kind}-{i}" for kind, count in ROWS.items() for i in range(count)]
+
+
+@pytest.mark.parametrize("export_format", ["json", "csv"])
+@pytest.mark.parametrize(
+    "fail_at",
+    [
+        # Mid way through a page of the first section
+        4,
+        # Mid way through the last page of the first section
+        ROWS["eligible"] - 1,
+        # In the first page of the second section, once rows of it are written
+        ROWS["eligible"] + 1,
+        # In the last page of the second section
+        ROWS["eligible"] + ROWS["active"] - 1,
+    ],
+)
+def test_interrupted_export_resumes_without_repeating_rows(
+    cli_ctx, tmp_path, client, export_format, fail_at
+):
+    path = str(tmp_path / f"export.{export_format}")
+    client.fail_at = fail_at
+
+    with pytest.raises(CLIError):
+        export(cli_ctx, path, export_format)
+
+    state_path = os.path.join(
+        cli_ctx.config.config_dir, "pim", _export.EXPORT_STATE_FILE
+    )
+    with open(state_path, encoding="utf-8") as f:
+        offset = json.load(f)["offset"]
+    # Rows of the page being written are in the file, beyond the saved offset
+    assert os.path.getsize(path) > offset
+
+    rows = export(cli_ctx, path, export_format, resume=True)
+
+    assert exported_ids(path, export_format) == all_ids()
+    assert rows == ROWS
+    assert not os.path.exists(state_path)
+
+
+def test_resume_truncates_the_file_to_the_saved_offset(cli_ctx, tmp_path, client):
+    path = str(tmp_path / "export.json")
+    client.fail_at = ROWS["eligible"] + 1
+    with pytest.raises(CLIError):
+        export(cli_ctx, path, "json")
+
+    # Stop before any row is written, so only the truncation is seen
+    client.fail_at = client.listed
+    with pytest.raises(CLIError):
+        export(cli_ctx, path, "json", resume=True)
+
+    assert exported_ids(path, "json") == all_ids()[: ROWS["eligible"]]
+
+
+def test_resume_of_another_export_is_refused(cli_ctx, tmp_path, client):
+    path = str(tmp_path / "export.json")
+    client.fail_at = 1
+    with pytest.raises(CLIError):
+        export(cli_ctx, path, "json")
+
+    with pytest.raises(CLIError, match="different rows, or in another format"):
+        export(cli_ctx, path, "csv", resume=True)
@@ -0,0 +1,189 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import sqlite3
+import time
+import types
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+import pytest
+from knack.util import CLIError
+from azext_pim import _history
+from azext_pim._records import RoleAssignmentRequest
+
+ACCOUNT = "home-tenant/user@example.com"
+DAY = timedelta(days=1)
+
+
+class FakeClient:
+    """Stand-in for PimClient, listing the given requests made at or after since."""
+
+    provider = "aadGroups"
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.since = []
+
+    def iter_pending(self, status=None, since=None):
+        self.since.append(since)
+        for request in self.requests:
+            if since is None or request.requested_at >= since:
+                yield request
+
+
+def request(request_id, age, sub_status="Provisioned"):
+    requested_at = datetime.now(timezone.utc).replace(microsecond=0) - age
+    return RoleAssignmentRequest(
+        request_id, "Prod", "Member", requested_at, "Closed", sub_status, "On call"
+    )
+
+
+@pytest.fixture
+def db(cli_ctx):
+    with closing(_history.connect(cli_ctx)) as db:
+        yield db
+
+
+def stored(db):
+    return sorted(row[0] for row in db.execute("SELECT id FROM requests"))
+
+
+def test_first_sync_fetches_everything(cli_ctx, db):
+    client = FakeClient([request("a", 30 * DAY), request("b", DAY)])
+
+    assert _history.sync(cli_ctx, db, client, ACCOUNT) == 2
+    assert client.since == [None]
+    assert stored(db) == ["a", "b"]
+
+
+def test_sync_within_the_interval_is_skipped(cli_ctx, db):
+    client = FakeClient([request("a", DAY)])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+
+    assert _history.sync(cli_ctx, db, client, ACCOUNT) is None
+    assert client.since == [None]
+
+
+def test_watermark_is_the_latest_request(cli_ctx, db):
+    latest = request("b", DAY)
+    client = FakeClient([request("a", 30 * DAY), latest])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+
+    _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+
+    assert client.since[-1] == latest.requested_at
+
+
+@pytest.mark.parametrize("finished", ["Provisioned", "provisioned", "Denied"])
+def test_finished_requests_are_not_synced_again(cli_ctx, db, finished):
+    latest = request("b", DAY)
+    client = FakeClient([request("a", 2 * DAY, finished), latest])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+
+    _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+
+    assert client.since[-1] == latest.requested_at
+
+
+def test_unfinished_request_in_the_resync_window_is_synced_again(cli_ctx, db):
+    pending = request("a", 2 * DAY, "PendingApproval")
+    client = FakeClient([request("old", 3 * DAY), pending, request("b", DAY)])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+
+    pending.sub_status = "Provisioned"
+    _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+
+    assert client.since[-1] == pending.requested_at
+    assert db.execute("SELECT sub_status FROM requests WHERE id = 'a'").fetchone() == (
+        "Provisioned",
+    )
+
+
+def test_unfinished_request_outside_the_resync_window_is_not(cli_ctx, db):
+    window = timedelta(seconds=_history.RESYNC_WINDOW)
+    latest = request("b", DAY)
+    client = FakeClient([request("a", window + DAY, "PendingApproval"), latest])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+
+    _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+
+    assert client.since[-1] == latest.requested_at
+
+
+def test_store_is_not_locked_while_fetching(cli_ctx, db, monkeypatch):
+    monkeypatch.setattr(_history, "SYNC_BATCH_SIZE", 2)
+    path = os.path.join(cli_ctx.config.config_dir, "pim", _history.HISTORY_DB_FILE)
+    client = FakeClient([request(str(i), (5 - i) * DAY) for i in range(5)])
+    written = []
+
+    def iter_pending(status=None, since=None):
+        for index, pending in enumerate(FakeClient.iter_pending(client, status, since)):
+            if index == 3:
+                # Another command writes to the store while this one is fetching
+                with closing(sqlite3.connect(path, timeout=0)) as other:
+                    with other:
+                        other.execute("DELETE FROM sync")
+                    written.append(stored(other))
+            yield pending
+
+    monkeypatch.setattr(client, "iter_pending", iter_pending)
+
+    assert _history.sync(cli_ctx, db, client, ACCOUNT) == 5
+    # The first batch had been committed when the other command looked
+    assert written == [["0", "1"]]
+
+
+def test_interrupted_sync_is_fetched_again(cli_ctx, db, monkeypatch):
+    first = request("a", 10 * DAY)
+    client = FakeClient([first])
+    _history.sync(cli_ctx, db, client, ACCOUNT)
+    # Synced shortly after the first request, and before the others were made
+    with db:
+        db.execute(
+            "UPDATE sync SET synced_at = ?", (first.requested_at.timestamp() + 60,)
+        )
+
+    monkeypatch.setattr(_history, "SYNC_BATCH_SIZE", 1)
+    newer = [request("c", DAY), request("b", 5 * DAY)]
+
+    def interrupted(status=None, since=None):
+        # Listed newest first, and the connection drops after the first batch
+        yield newer[0]
+        raise CLIError("Unable to connect to the PIM API")
+
+    monkeypatch.setattr(client, "iter_pending", interrupted)
+    with pytest.raises(CLIError):
+        _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+    assert stored(db) == ["a", "c"]
+
+    client = FakeClient([first, *newer])
+    _history.sync(cli_ctx, db, client, ACCOUNT, refresh=True)
+
+    # Not from the newest row stored, which would skip the request never written
+    assert client.since == [first.requested_at]
+    assert stored(db) == ["a", "b", "c"]
+
+
+def test_broken_store_is_reported(cli_ctx, monkeypatch):
+    from azext_pim import _token_cache
+    from azext_pim.custom import history_pim
+
+    monkeypatch.setattr(_token_cache, "account_key", lambda cli_ctx: ACCOUNT)
+    path = os.path.join(cli_ctx.config.config_dir, "pim", _history.HISTORY_DB_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"not a database" * 100)
+
+    with pytest.raises(CLIError, match="Unable to use the history store"):
+        history_pim(types.SimpleNamespace(cli_ctx=cli_ctx))
+
+
+def test_sync_time_is_recorded(cli_ctx, db):
+    before = time.time()
+    _history.sync(cli_ctx, db, FakeClient([]), ACCOUNT)
+
+    (synced_at,) = db.execute("SELECT synced_at FROM sync").fetchone()
+    assert synced_at >= before
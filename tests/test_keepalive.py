@@ -0,0 +1,169 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from datetime import datetime, timezone
+import pytest
+from knack.util import CLIError
+from azext_pim import _keepalive
+from azext_pim._records import RoleAssignment, RoleAssignmentRequest
+
+HOUR = 3600
+MARGIN = 10 * 60
+START = 1_800_000_000
+
+
+class FakeClock:
+    """Stand-in for the time module, where sleeping only moves the clock on."""
+
+    def __init__(self):
+        self.now = START
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeClient:
+    """Stand-in for PimClient with one active group, renewed as the script says.
+
+    Each renewal takes the next outcome from the script: "refused" raises, "pending"
+    waits for approval until approve() is called, and "provisioned" extends the
+    activation at once. The last outcome is repeated.
+    """
+
+    def __init__(self, clock, script, end):
+        self.clock = clock
+        self.script = list(script)
+        self.end = end
+        self.requested_at = []
+        self.pending = {}
+
+    def request(self, assignment, reason, duration_hours):
+        self.requested_at.append(self.clock.now)
+        outcome = self.script[min(len(self.requested_at), len(self.script)) - 1]
+        if outcome == "refused":
+            raise CLIError("The role assignment already exists.")
+        request_id = f"request-{len(self.requested_at)}"
+        if outcome == "pending":
+            self.pending[request_id] = duration_hours
+            return self._request(request_id, "PendingApproval")
+        self._provision(duration_hours)
+        return self._request(request_id, "Provisioned")
+
+    def get_request(self, request_id):
+        if request_id in self.pending:
+            return self._request(request_id, "PendingApproval")
+        return self._request(request_id, "Provisioned")
+
+    def approve(self):
+        for duration_hours in self.pending.values():
+            self._provision(duration_hours)
+        self.pending.clear()
+
+    def iter_active(self):
+        if self.end > self.clock.now:
+            end = datetime.fromtimestamp(self.end, timezone.utc)
+            yield RoleAssignment("group-id", "Prod", "member", "Member", end=end)
+
+    def _provision(self, duration_hours):
+        self.end = self.clock.now + duration_hours * HOUR
+
+    @staticmethod
+    def _request(request_id, sub_status):
+        return RoleAssignmentRequest(
+            request_id, "Prod", "Member", sub_status=sub_status
+        )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(_keepalive, "time", clock)
+    return clock
+
+
+def keepalive(client, max_renewals=5):
+    activation = {
+        "groupName": "Prod",
+        "role": "Member",
+        "assignment": next(client.iter_active()),
+        "reason": "On call",
+        "end": client.end,
+    }
+    _keepalive.run_keepalive(client, [activation], MARGIN, 1, max_renewals, 1)
+    return activation
+
+
+def test_renewals_stop_at_the_limit(clock):
+    client = FakeClient(clock, ["provisioned"], START + HOUR)
+
+    activation = keepalive(client, max_renewals=2)
+
+    assert activation["renewals"] == 2
+    assert activation["status"] == "Renewal limit reached"
+    assert client.requested_at == [START + HOUR - MARGIN, START + 2 * HOUR - 2 * MARGIN]
+
+
+def test_refusal_while_active_is_retried_when_it_ends(clock):
+    client = FakeClient(clock, ["refused", "provisioned"], START + HOUR)
+
+    activation = keepalive(client, max_renewals=1)
+
+    # Not retried every minute while still active, and the refusal is not counted
+    assert client.requested_at == [START + HOUR - MARGIN, START + HOUR]
+    assert activation["renewals"] == 1
+    assert activation["failures"] == 0
+
+
+def test_refusals_once_ended_are_given_up_after_the_limit(clock):
+    client = FakeClient(clock, ["refused"], START + HOUR)
+
+    activation = keepalive(client)
+
+    ended = START + HOUR
+    assert client.requested_at == [
+        ended - MARGIN,
+        ended,
+        ended + _keepalive.RECHECK_INTERVAL,
+        ended + 2 * _keepalive.RECHECK_INTERVAL,
+    ]
+    assert activation["failures"] == _keepalive.MAX_CONSECUTIVE_FAILURES
+    assert activation["status"].startswith("Renewal failed")
+    assert activation["renewals"] == 0
+
+
+def test_pending_approval_is_not_sent_again(clock, monkeypatch):
+    client = FakeClient(clock, ["pending", "provisioned"], START + HOUR)
+    checks = []
+    get_request = client.get_request
+
+    def approve_on_third_check(request_id):
+        checks.append(clock.now)
+        if len(checks) == 3:
+            client.approve()
+        return get_request(request_id)
+
+    monkeypatch.setattr(client, "get_request", approve_on_third_check)
+
+    activation = keepalive(client, max_renewals=1)
+
+    assert client.requested_at == [START + HOUR - MARGIN]
+    assert len(checks) == 3
+    assert activation["renewals"] == 1
+    assert activation["end"] == checks[-1] + HOUR
+
+
+def test_provisioned_renewal_which_never_shows_counts_as_a_failure(clock, monkeypatch):
+    client = FakeClient(clock, ["provisioned"], START + HOUR)
+    # Provisioned, yet the new activation never shows up as active
+    monkeypatch.setattr(client, "_provision", lambda duration_hours: None)
+
+    activation = keepalive(client)
+
+    assert activation["failures"] == _keepalive.MAX_CONSECUTIVE_FAILURES
+    assert activation["status"] == "Renewal not active"
+    assert activation["renewals"] == 0
@@ -0,0 +1,176 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import types
+import urllib.parse
+from datetime import datetime, timezone
+import pytest
+from knack.util import CLIError
+from azext_pim import custom, pim
+from azext_pim.client import PimClient
+
+BASE_URL = "https://api.azrbac.mspim.azure.com/api/v2/privilegedAccess"
+USER_ID = "00000000-0000-0000-0000-000000000001"
+EXPAND = "resource($select=displayName),roleDefinition($select=id,displayName)"
+
+
+@pytest.fixture
+def settings():
+    # Always query the API for eligible assignments, rather than the cache
+    return {"pim.eligibility_cache_ttl": 0}
+
+
+@pytest.fixture
+def urls(monkeypatch):
+    """The URLs of the PIM API queries made, which return no items."""
+    requested = []
+
+    def iter_pages(cli_ctx, url, *_, **__):
+        requested.append(url)
+        return iter([])
+
+    monkeypatch.setattr(pim, "iter_pages", iter_pages)
+    return requested
+
+
+@pytest.fixture
+def client(cli_ctx):
+    client = PimClient(cli_ctx)
+    client._user_id = USER_ID  # pylint: disable=protected-access
+    return client
+
+
+def parse(url):
+    """Split a query URL into its path and decoded query parameters."""
+    path, query = url.split("?", 1)
+    return path, {
+        name: urllib.parse.unquote(value)
+        for name, value in (param.split("=", 1) for param in query.split("&"))
+    }
+
+
+def test_list_url(client, urls):
+    client.list_eligible()
+
+    assert parse(urls[0]) == (
+        f"{BASE_URL}/aadGroups/roleAssignments",
+        {
+            "$filter": f"subjectId eq '{USER_ID}' and assignmentState eq 'Eligible'",
+            "$select": "resourceId,memberType",
+            "$expand": EXPAND,
+        },
+    )
+
+
+def test_active_url(client, urls):
+    client.list_active()
+
+    assert parse(urls[0]) == (
+        f"{BASE_URL}/aadGroups/roleAssignments",
+        {
+            "$filter": f"subjectId eq '{USER_ID}' and assignmentState eq 'Active'",
+            "$select": "id,resourceId,memberType,endDateTime,status",
+            "$expand": EXPAND,
+        },
+    )
+
+
+def test_pending_url(client, urls):
+    client.list_pending()
+
+    assert parse(urls[0]) == (
+        f"{BASE_URL}/aadGroups/roleAssignmentRequests",
+        {
+            "$filter": f"subjectId eq '{USER_ID}' and status/subStatus eq 'PendingApproval'",
+            "$select": "id,requestedDateTime,status,reason",
+            "$expand": EXPAND,
+        },
+    )
+
+
+def test_single_group_request_url(cli_ctx, urls, monkeypatch):
+    monkeypatch.setattr(PimClient, "user_id", USER_ID)
+    cmd = types.SimpleNamespace(cli_ctx=cli_ctx)
+    with pytest.raises(CLIError, match="No eligible group found"):
+        custom.request_pim(cmd, ["My-PIM-Group"], "Testing")
+
+    assert parse(urls[0]) == (
+        f"{BASE_URL}/aadGroups/roleAssignments",
+        {
+            "$filter": f"subjectId eq '{USER_ID}' and assignmentState eq 'Eligible' "
+            "and resource/displayName eq 'My-PIM-Group'",
+            "$select": "resourceId,memberType",
+            "$expand": EXPAND,
+        },
+    )
+
+
+def test_latest_request_url(client, urls):
+    client.get_latest_request("My-PIM-Group", "Member")
+
+    assert parse(urls[0]) == (
+        f"{BASE_URL}/aadGroups/roleAssignmentRequests",
+        {
+            "$filter": f"subjectId eq '{USER_ID}' and resource/displayName eq 'My-PIM-Group'",
+            "$select": "id,requestedDateTime,status,reason",
+            "$expand": EXPAND,
+        },
+    )
+
+
+def test_requests_since_url(client, urls):
+    since = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    list(client.iter_pending(None, since=since))
+
+    _, params = parse(urls[0])
+    assert params["$filter"] == (
+        f"subjectId eq '{USER_ID}' and requestedDateTime ge 2026-01-02T03:04:05Z"
+    )
+
+
+def test_provider_url(cli_ctx, urls):
+    client = PimClient(cli_ctx, provider=pim.PROVIDERS["roles"])
+    client._user_id = USER_ID  # pylint: disable=protected-access
+    client.list_active()
+
+    assert urls[0].startswith(f"{BASE_URL}/aadroles/roleAssignments?")
+
+
+def test_group_name_is_escaped(client, urls):
+    client.list_eligible(group_name="O'Brien & Co")
+
+    assert urls[0].count("&") == 2
+    _, params = parse(urls[0])
+    assert params["$filter"].endswith("resource/displayName eq 'O''Brien & Co'")
+
+
+@pytest.mark.parametrize(
+    "value, quoted",
+    [
+        ("My-PIM-Group", "'My-PIM-Group'"),
+        ("O'Brien", "'O''Brien'"),
+        ("''", "''''''"),
+        ("", "''"),
+    ],
+)
+def test_quote_odata(value, quoted):
+    assert pim._quote_odata(value) == quoted  # pylint: disable=protected-access
+
+
+def test_build_query_url_without_filters():
+    assert (
+        pim.build_query_url("roleAssignments/abc", None, ["id"], None)
+        == f"{BASE_URL}/aadGroups/roleAssignments/abc?$select=id"
+    )
+
+
+@pytest.mark.parametrize("kind", ["eligible", "active"])
+def test_export_selects_assignment_end_and_id(client, urls, kind):
+    from azext_pim import _export
+
+    list(_export._iter_records(client, kind, {}))  # pylint: disable=protected-access
+
+    _, params = parse(urls[0])
+    assert params["$select"] == "id,resourceId,memberType,endDateTime,status"
@@ -0,0 +1,212 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import types
+from email.utils import formatdate
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from azext_pim import _session
+
+URL = "https://api.example.com/roleAssignments"
+
+# Wall clock time when the fake clock starts
+EPOCH = 1_800_000_000
+
+
+class StubAdapter(BaseAdapter):
+    """Answers requests in turn with the given (status, headers), repeating the last."""
+
+    def __init__(self, responses, clock=time):
+        super().__init__()
+        self.responses = list(responses)
+        self.clock = clock
+        self.sent = []
+
+    def send(self, request, **_):
+        self.sent.append((request.method, self.clock.monotonic()))
+        status, headers = self.responses[min(len(self.sent), len(self.responses)) - 1]
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.request = request
+        response.url = request.url
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    """Stand-in for the time module, where sleeping only moves the clock on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return EPOCH + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(_session, "_deadline", None)
+    monkeypatch.setattr(_session, "_breaker_open_until", 0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(_session, "time", clock)
+    # The longest backoff for each attempt, rather than a random one
+    monkeypatch.setattr(_session.random, "uniform", lambda low, high: high)
+    return clock
+
+
+@pytest.fixture
+def stub(monkeypatch, clock):
+    def install(*responses):
+        adapter = StubAdapter(responses, clock)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        monkeypatch.setattr(_session, "_session", session)
+        return adapter
+
+    return install
+
+
+def send(cli_ctx, method="GET"):
+    return _session._send_with_retries(cli_ctx, method, URL, None, {})
+
+
+def test_retry_after_in_seconds_is_honoured(cli_ctx, stub, clock):
+    adapter = stub((429, {"Retry-After": "7"}), (200, {}))
+
+    assert send(cli_ctx).status_code == 200
+    assert len(adapter.sent) == 2
+    assert clock.sleeps == [7]
+
+
+def test_retry_after_as_http_date_is_honoured(cli_ctx, stub, clock):
+    retry_at = formatdate(EPOCH + 20, usegmt=True)
+    adapter = stub((503, {"Retry-After": retry_at}), (200, {}))
+
+    assert send(cli_ctx).status_code == 200
+    assert len(adapter.sent) == 2
+    assert clock.sleeps == [pytest.approx(20)]
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [{"pim.retry_max_attempts": 4, "pim.retry_backoff_base": 1}],
+)
+def test_attempts_are_limited_with_exponential_backoff(cli_ctx, stub, clock):
+    adapter = stub((500, {}))
+
+    assert send(cli_ctx).status_code == 500
+    assert len(adapter.sent) == 4
+    assert clock.sleeps == [1, 2, 4]
+
+
+@pytest.mark.parametrize(
+    "settings", [{"pim.retry_backoff_base": 10, "pim.retry_backoff_max": 15}]
+)
+def test_backoff_is_capped(cli_ctx, stub, clock):
+    stub((502, {}))
+
+    send(cli_ctx)
+
+    assert clock.sleeps == [10, 15, 15]
+
+
+def test_post_is_not_retried_on_server_error(cli_ctx, stub, clock):
+    adapter = stub((500, {}), (200, {}))
+
+    assert send(cli_ctx, "POST").status_code == 500
+    assert len(adapter.sent) == 1
+    assert not clock.sleeps
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_post_is_retried_when_not_processed(cli_ctx, stub, status):
+    adapter = stub((status, {"Retry-After": "1"}), (201, {}))
+
+    assert send(cli_ctx, "POST").status_code == 201
+    assert [method for method, _ in adapter.sent] == ["POST", "POST"]
+
+
+@pytest.mark.parametrize("settings", [{"pim.deadline": 10}])
+def test_deadline_stops_retries(cli_ctx, stub, clock):
+    adapter = stub((503, {"Retry-After": "4"}))
+
+    assert send(cli_ctx).status_code == 503
+    # Retried at 4s and 8s, the next retry at 12s would be past the deadline
+    assert [sent_at for _, sent_at in adapter.sent] == [0, 4, 8]
+
+
+@pytest.mark.parametrize("settings", [{"pim.deadline": 10}])
+def test_call_after_the_deadline_fails(cli_ctx, stub, clock):
+    adapter = stub((200, {}))
+    send(cli_ctx)
+    clock.now = 11
+
+    with pytest.raises(_session.CLIError, match="deadline exceeded"):
+        send(cli_ctx)
+    assert len(adapter.sent) == 1
+
+
+def test_throttling_holds_back_concurrent_calls(cli_ctx, monkeypatch):
+    throttled = threading.Event()
+
+    class ThrottleFirst(StubAdapter):
+        def send(self, request, **kwargs):
+            response = super().send(request, **kwargs)
+            if response.status_code == 429:
+                throttled.set()
+            return response
+
+    adapter = ThrottleFirst([(429, {"Retry-After": "0.5"}), (200, {})])
+    session = requests.Session()
+    session.mount("https://", adapter)
+    monkeypatch.setattr(_session, "_session", session)
+
+    first = threading.Thread(target=send, args=(cli_ctx,))
+    first.start()
+    throttled.wait(5)
+    # Another call started while the first is throttled waits for the breaker too
+    second = threading.Thread(target=send, args=(cli_ctx,))
+    second.start()
+    first.join(5)
+    second.join(5)
+
+    throttled_at = adapter.sent[0][1]
+    assert len(adapter.sent) == 3
+    assert all(sent_at - throttled_at >= 0.45 for _, sent_at in adapter.sent[1:])
+
+
+def test_unthrottled_calls_are_not_held_back(cli_ctx, stub, clock):
+    stub((200, {}))
+
+    send(cli_ctx)
+    send(cli_ctx)
+
+    assert not clock.sleeps
+
+
+def test_retry_after_is_ignored_when_unreadable():
+    response = types.SimpleNamespace(headers={"Retry-After": "soon"})
+
+    assert _session._get_retry_after(response) is None
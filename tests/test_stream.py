@@ -0,0 +1,56 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import pytest
+from azext_pim._stream import iter_json_array
+
+ITEMS = [
+    1.5,
+    -2,
+    -0.25,
+    3e10,
+    1.25e-7,
+    -6.02e23,
+    0,
+    True,
+    None,
+    'text with "quotes" and ünïcödé ✓',
+    {"id": "a-1", "resource": {"displayName": "Gröup"}, "weight": -12.75e2},
+    [1, 2.5, [3e1]],
+    1234567890.0987654,
+]
+
+
+def chunked(data, size):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", range(1, 8))
+def test_items_are_decoded_whatever_the_chunk_size(size):
+    body = {"@odata.context": "ctx", "value": ITEMS, "@odata.nextLink": "next"}
+    members = {}
+    data = json.dumps(body, indent=1, ensure_ascii=False).encode()
+
+    assert list(iter_json_array(chunked(data, size), "value", members)) == ITEMS
+    assert members == {"@odata.context": "ctx", "@odata.nextLink": "next"}
+
+
+@pytest.mark.parametrize("size", range(1, 8))
+def test_numbers_cut_after_every_character(size):
+    items = [float(f"-{n}.{n}e-{n}") for n in range(1, 10)] + [10, 2.0, -3]
+    data = json.dumps({"value": items}, separators=(",", ":")).encode()
+
+    assert list(iter_json_array(chunked(data, size), "value")) == items
+
+
+def test_empty_array_and_object():
+    assert not list(iter_json_array([b'{"value": []}'], "value"))
+    assert not list(iter_json_array([b"{}"], "value"))
+
+
+def test_truncated_response_is_an_error():
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(b'{"value": [1.5, 2', 3), "value"))
@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Ben Coleman, 2026. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import time
+import pytest
+from azext_pim import _token_cache
+
+RESOURCE = "https://api.azrbac.mspim.azure.com"
+
+
+class FakeProfile:
+    """Stand-in for the CLI Profile, counting token acquisitions for each tenant."""
+
+    acquisitions = []
+    lifetime = 3600
+
+    def __init__(self, cli_ctx=None, **_):
+        pass
+
+    def get_raw_token(self, resource=None, tenant=None, **_):
+        FakeProfile.acquisitions.append(tenant)
+        token = f"token-{tenant or 'home'}-{len(FakeProfile.acquisitions)}"
+        entry = {"expires_on": int(time.time()) + FakeProfile.lifetime}
+        return ("Bearer", token, entry), None, tenant or "home-tenant"
+
+    def get_subscription(self):
+        return {"tenantId": "home-tenant", "user": {"name": "user@example.com"}}
+
+
+@pytest.fixture(autouse=True)
+def fake_profile(monkeypatch):
+    from azure.cli.core import _profile
+
+    monkeypatch.setattr(_profile, "Profile", FakeProfile)
+    monkeypatch.setattr(FakeProfile, "acquisitions", [])
+    monkeypatch.setattr(FakeProfile, "lifetime", 3600)
+    _token_cache.clear_tokens()
+    yield FakeProfile
+    _token_cache.clear_tokens()
+
+
+def test_token_is_acquired_once_per_process(cli_ctx, fake_profile):
+    tokens = {_token_cache.get_token(cli_ctx, RESOURCE) for _ in range(5)}
+
+    assert len(tokens) == 1
+    assert fake_profile.acquisitions == [None]
+
+
+def test_token_is_refreshed_near_expiry(cli_ctx, fake_profile):
+    fake_profile.lifetime = _token_cache.TOKEN_REFRESH_MARGIN - 1
+    first = _token_cache.get_token(cli_ctx, RESOURCE)
+    second = _token_cache.get_token(cli_ctx, RESOURCE)
+
+    assert first != second
+    assert len(fake_profile.acquisitions) == 2
+
+
+def test_token_outside_refresh_margin_is_reused(cli_ctx, fake_profile):
+    fake_profile.lifetime = _token_cache.TOKEN_REFRESH_MARGIN + 60
+    _token_cache.get_token(cli_ctx, RESOURCE)
+    _token_cache.get_token(cli_ctx, RESOURCE)
+
+    assert len(fake_profile.acquisitions) == 1
+
+
+def test_tokens_are_kept_per_tenant(cli_ctx, fake_profile):
+    for _ in range(3):
+        home = _token_cache.get_token(cli_ctx, RESOURCE)
+        tenant_1 = _token_cache.get_token(cli_ctx, RESOURCE, "tenant-1")
+        tenant_2 = _token_cache.get_token(cli_ctx, RESOURCE, "tenant-2")
+
+    assert len({home, tenant_1, tenant_2}) == 3
+    assert fake_profile.acquisitions == [None, "tenant-1", "tenant-2"]
+
+
+def test_clear_tokens_forces_acquisition(cli_ctx, fake_profile):
+    _token_cache.get_token(cli_ctx, RESOURCE)
+    _token_cache.clear_tokens()
+    _token_cache.get_token(cli_ctx, RESOURCE)
+
+    assert len(fake_profile.acquisitions) == 2
+
+
+@pytest.mark.parametrize("settings", [{"pim.token_cache_persist": True}])
+def test_on_disk_cache_is_used_by_the_next_process(cli_ctx, fake_profile):
+    first = _token_cache.get_token(cli_ctx, RESOURCE, "tenant-1")
+    # A new process starts with nothing in memory
+    _token_cache.clear_tokens()
+    second = _token_cache.get_token(cli_ctx, RESOURCE, "tenant-1")
+    other = _token_cache.get_token(cli_ctx, RESOURCE, "tenant-2")
+
+    assert first == second
+    assert other != first
+    assert fake_profile.acquisitions == ["tenant-1", "tenant-2"]
+
+
+def test_account_key_is_per_tenant_and_account(cli_ctx):
+    assert _token_cache.account_key(cli_ctx) == "home-tenant/user@example.com"
+    assert _token_cache.account_key(cli_ctx, "tenant-1") == "tenant-1/user@example.com"
+
+
+def test_expiry_is_read_from_older_expires_on_string():
+    expires = time.time() + 3600
+    entry = {
+        "expiresOn": time.strftime("%Y-%m-%d %H:%M:%S.000000", time.localtime(expires))
+    }
+
+    assert abs(_token_cache._get_expiry(entry) - expires) <= 1
+
+
+def test_unknown_expiry_is_never_fresh():
+    assert _token_cache._get_expiry({}) == 0